@@ -0,0 +1,214 @@
+"""
+Skeleton Lizard Benchmark Suite
+Times update, the pose stage, draw and the HUD headlessly across lizard counts,
+spine lengths and window sizes, and writes the results as JSON
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from skeleton_lizard import BACKGROUND_COLOR, SkeletonLizard, draw_hud, init_pygame
+
+LIZARD_COUNTS = [1, 10, 100]
+SPINE_LENGTHS = [8, 32, 128]
+WINDOW_SIZES = [(1024, 768), (1920, 1080), (3840, 2160)]
+SERPENT_LENGTHS = [1000, 5000, 10000]
+
+
+def random_targets(width, height, frames, seed):
+    """Cursor path that jumps to a new random point every 45 frames."""
+    rng = random.Random(seed)
+    targets = []
+    for frame in range(frames):
+        if frame % 45 == 0:
+            target = (rng.uniform(0, width), rng.uniform(0, height))
+        targets.append(target)
+    return targets
+
+
+def bench_case(lizard_count, spine_segments, size, frames, warmup):
+    """Run one configuration and return its timings."""
+    width, height = size
+    screen = pygame.display.set_mode(size)
+    rng = random.Random(lizard_count * 1000 + spine_segments)
+    lizards = [SkeletonLizard(rng.uniform(0, width), rng.uniform(0, height), spine_segments)
+               for _ in range(lizard_count)]
+    targets = random_targets(width, height, warmup + frames, seed=spine_segments)
+
+    update_time = pose_time = draw_time = hud_time = present_time = 0.0
+    perf = time.perf_counter
+    for frame, (target_x, target_y) in enumerate(targets):
+        measured = frame >= warmup
+
+        start = perf()
+        for lizard in lizards:
+            lizard.update(target_x, target_y)
+        after_update = perf()
+
+        for lizard in lizards:
+            lizard.compute_pose(1.0, target_x, target_y)
+        after_pose = perf()
+
+        screen.fill(BACKGROUND_COLOR)
+        joints = []
+        for lizard in lizards:
+            lizard.draw(screen, joints)
+        screen.blits(joints, doreturn=False)
+        after_draw = perf()
+
+        draw_hud(screen, lizards[0])
+        after_hud = perf()
+
+        pygame.display.flip()
+        after_present = perf()
+
+        if measured:
+            update_time += after_update - start
+            pose_time += after_pose - after_update
+            draw_time += after_draw - after_pose
+            hud_time += after_hud - after_draw
+            present_time += after_present - after_hud
+
+    lizard_calls = frames * lizard_count
+    frame_time = update_time + pose_time + draw_time + hud_time + present_time
+    return {
+        "lizards": lizard_count,
+        "spine_segments": spine_segments,
+        "width": width,
+        "height": height,
+        "frames": frames,
+        "fps": frames / frame_time if frame_time else None,
+        "frame_ms": frame_time / frames * 1e3,
+        "update_us": update_time / lizard_calls * 1e6,
+        "pose_us": pose_time / lizard_calls * 1e6,
+        "draw_us": draw_time / lizard_calls * 1e6,
+        "hud_us": hud_time / frames * 1e6,
+        "present_us": present_time / frames * 1e6,
+    }
+
+
+def bench_serpent(spine_segments, size, frames, warmup):
+    """Time the serpent's array solver against SkeletonLizard's segment loop.
+
+    Both chains start straight at the rest length and chase the same
+    targets; ``max_deviation`` is the largest distance between matching
+    nodes over the run.
+    """
+    import numpy as np
+
+    from serpent import Serpent
+
+    width, height = size
+    serpent = Serpent(width / 2, height / 2, spine_segments)
+    lizard = SkeletonLizard(width / 2, height / 2, spine_segments)
+    lizard.spine_positions = serpent.spine_positions.tolist()
+    lizard.prev_spine_positions = serpent.spine_positions.tolist()
+    targets = random_targets(width, height, warmup + frames, seed=spine_segments)
+
+    loop_time = solver_time = 0.0
+    passes = 0
+    max_deviation = 0.0
+    perf = time.perf_counter
+    for frame, (target_x, target_y) in enumerate(targets):
+        start = perf()
+        lizard.update(target_x, target_y)
+        after_loop = perf()
+        serpent.update(target_x, target_y)
+        after_solver = perf()
+
+        if frame >= warmup:
+            loop_time += after_loop - start
+            solver_time += after_solver - after_loop
+            passes += serpent.swarm.solver_passes
+            delta = serpent.spine_positions - lizard.spine_positions
+            max_deviation = max(max_deviation, float(np.sqrt((delta ** 2).sum(axis=1)).max()))
+
+    return {
+        "spine_segments": spine_segments,
+        "frames": frames,
+        "loop_update_ms": loop_time / frames * 1e3,
+        "solver_update_ms": solver_time / frames * 1e3,
+        "speedup": loop_time / solver_time if solver_time else None,
+        "solver_passes": passes / frames,
+        "max_deviation": max_deviation,
+    }
+
+
+def run_suite(lizard_counts, spine_lengths, window_sizes, frames, warmup, log=print):
+    init_pygame(headless=True)
+    results = []
+    try:
+        for size in window_sizes:
+            for spine_segments in spine_lengths:
+                for lizard_count in lizard_counts:
+                    result = bench_case(lizard_count, spine_segments, size, frames, warmup)
+                    results.append(result)
+                    log(f"{size[0]}x{size[1]} spine={spine_segments:<4} lizards={lizard_count:<5} "
+                        f"{result['fps']:8.1f} fps  update {result['update_us']:8.1f} us  "
+                        f"pose {result['pose_us']:8.1f} us  "
+                        f"draw {result['draw_us']:8.1f} us  hud {result['hud_us']:8.1f} us")
+    finally:
+        pygame.quit()
+    return results
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lizards", type=int, nargs="+", default=LIZARD_COUNTS,
+                        help="lizard counts to benchmark")
+    parser.add_argument("--spines", type=int, nargs="+", default=SPINE_LENGTHS,
+                        help="spine segment counts to benchmark")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=WINDOW_SIZES,
+                        help="window sizes such as 1024x768")
+    parser.add_argument("--serpents", type=int, nargs="*", default=SERPENT_LENGTHS,
+                        help="serpent chain lengths to compare against the segment loop (none to skip)")
+    parser.add_argument("--frames", type=int, default=120, help="measured frames per case")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames per case")
+    parser.add_argument("--output", default=None, help="write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_suite(args.lizards, args.spines, args.sizes, args.frames, args.warmup)
+    serpent_results = []
+    for spine_segments in args.serpents:
+        result = bench_serpent(spine_segments, args.sizes[0], args.frames, args.warmup)
+        serpent_results.append(result)
+        print(f"serpent spine={spine_segments:<6} loop {result['loop_update_ms']:7.2f} ms  "
+              f"solver {result['solver_update_ms']:7.2f} ms  passes {result['solver_passes']:5.1f}  "
+              f"max deviation {result['max_deviation']:5.2f} px")
+    report = {
+        "benchmark": "skeleton_lizard",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": results,
+        "serpent": serpent_results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
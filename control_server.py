@@ -0,0 +1,304 @@
+"""
+Local Control Server
+Newline-delimited JSON commands over a localhost socket, served by asyncio
+in a background thread. Commands are handed to the main loop through a
+bounded queue that it drains once per frame; target updates are coalesced
+so a flood of them costs the frame at most one update per lizard
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from array import array
+from collections import deque
+
+from frame_profiler import PERCENTILES, percentile
+
+# Commands the main loop applies; "target" is coalesced and answered at once
+COMMANDS = ("spawn", "remove", "target", "waypoints", "speed", "query", "stats")
+# Largest coordinate a client may send; far outside any window, yet small
+# enough that squared distances in the simulation stay finite
+MAX_COORDINATE = 1e6
+# Longest spine a client may spawn
+MAX_SPAWN_SEGMENTS = 64
+
+
+def coordinate(value, name):
+    """``value`` as a float; raises ValueError unless it is finite and within ``MAX_COORDINATE``."""
+    value = float(value)
+    if not abs(value) <= MAX_COORDINATE:  # Also false for NaN
+        raise ValueError(f"{name} must be a number within +-{MAX_COORDINATE:g}")
+    return value
+
+
+def check_args(name, args):
+    """Validate a command's arguments before it is queued.
+
+    Raises ValueError, KeyError or TypeError for arguments the main loop
+    could not apply, so a bad request never reaches the frame.
+    """
+    if name == "target":
+        coordinate(args["x"], "x")
+        coordinate(args["y"], "y")
+    elif name == "spawn":
+        for axis in ("x", "y"):
+            if axis in args:
+                coordinate(args[axis], axis)
+        segments = int(args.get("segments", 8))
+        if not 1 <= segments <= MAX_SPAWN_SEGMENTS:
+            raise ValueError(f"segments must be between 1 and {MAX_SPAWN_SEGMENTS}")
+    elif name == "waypoints":
+        for x, y in args["points"]:
+            coordinate(x, "waypoint x")
+            coordinate(y, "waypoint y")
+    elif name == "speed":
+        for key in ("walk_speed", "run_speed"):
+            if key in args:
+                value = float(args[key])
+                if not (math.isfinite(value) and value >= 0):
+                    raise ValueError(f"{key} must be a finite number >= 0")
+
+
+class Command:
+    """One queued request: its name, arguments and when it was received."""
+
+    __slots__ = ("name", "args", "received", "_future", "_loop")
+
+    def __init__(self, name, args, received, future=None, loop=None):
+        self.name = name
+        self.args = args
+        self.received = received
+        self._future = future
+        self._loop = loop
+
+    def reply(self, result=None, error=None):
+        """Answer the client; safe to call from the main thread."""
+        if self._future is not None:
+            self._loop.call_soon_threadsafe(self._resolve, result, error)
+
+    def _resolve(self, result, error):
+        if not self._future.done():
+            self._future.set_result((result, error))
+
+
+class ControlServer:
+    """JSON-lines control socket bridged to the main loop.
+
+    Each request is one line such as ``{"id": 1, "cmd": "spawn", "x": 100,
+    "y": 200}`` and gets one response line ``{"id": 1, "ok": true, "result":
+    ...}``. At most ``max_pending`` commands wait for the main loop; beyond
+    that clients get a ``busy`` error instead of slowing frames down.
+    ``wake`` is called from the server thread when work arrives for a drained
+    queue, so a main loop blocked waiting for input (idle pacing) can be
+    woken, e.g. by posting a pygame event. ``lizard_ids`` is the set of
+    lizard ids the main loop currently has, published by the main loop so
+    targets for unknown lizards can be refused.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, max_pending=256, latency_samples=1024, wake=None):
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.wake = wake
+        self.lizard_ids = None
+        self._lock = threading.Lock()
+        self._pending = deque()
+        # Latest target per lizard id: (x, y, received)
+        self._targets = {}
+        self.coalesced = 0
+        self.rejected = 0
+
+        # Ring buffer of command-to-present latencies in seconds
+        self._latencies = array('d', bytes(8 * latency_samples))
+        self._latency_count = 0
+        self._presented = []
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+
+    def start(self):
+        """Start serving in a daemon thread; returns once the socket is bound."""
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port))
+        # Report the real port when bound to port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            # Drop open connections and requests still waiting on the main loop
+            self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away, or the server is shutting down
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line):
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            name = request["cmd"]
+        except (ValueError, KeyError, AttributeError):
+            return {"id": None, "ok": False, "error": "expected a JSON object with a 'cmd'"}
+        if name not in COMMANDS:
+            return {"id": request_id, "ok": False, "error": f"unknown command: {name}"}
+        try:
+            check_args(name, request)
+        except KeyError as error:
+            return {"id": request_id, "ok": False, "error": f"{name} needs {error}"}
+        except (TypeError, ValueError) as error:
+            return {"id": request_id, "ok": False, "error": f"{name}: {error}"}
+
+        if name == "target":
+            # Coalesced: only the newest target per lizard reaches the frame
+            try:
+                key = request["lizard"]
+                known = self.lizard_ids is None or key in self.lizard_ids
+            except (KeyError, TypeError):
+                return {"id": request_id, "ok": False, "error": "target needs lizard, x and y"}
+            if not known:
+                return {"id": request_id, "ok": False, "error": f"no lizard {key}"}
+            x, y = float(request["x"]), float(request["y"])
+            with self._lock:
+                idle = not self._pending and not self._targets
+                if key in self._targets:
+                    self.coalesced += 1
+                self._targets[key] = (x, y, received)
+            if idle and self.wake is not None:
+                self.wake()
+            return {"id": request_id, "ok": True, "result": None}
+
+        future = self._loop.create_future()
+        command = Command(name, request, received, future, self._loop)
+        with self._lock:
+            idle = not self._pending and not self._targets
+            accepted = len(self._pending) < self.max_pending
+            if accepted:
+                self._pending.append(command)
+            else:
+                self.rejected += 1
+        if not accepted:
+            return {"id": request_id, "ok": False, "error": "busy"}
+        if idle and self.wake is not None:
+            self.wake()
+        result, error = await future
+        if error is not None:
+            return {"id": request_id, "ok": False, "error": error}
+        return {"id": request_id, "ok": True, "result": result}
+
+    def drain(self):
+        """Take every waiting command and the latest targets, in one batch.
+
+        Returns ``(commands, targets)`` where ``targets`` maps lizard id to
+        ``(x, y, received)``. Called by the main loop once per frame.
+        """
+        with self._lock:
+            if not self._pending and not self._targets:
+                return (), {}
+            commands, self._pending = self._pending, deque()
+            targets, self._targets = self._targets, {}
+        return commands, targets
+
+    def applied(self, received):
+        """Note that a command received at ``received`` is in this frame."""
+        self._presented.append(received)
+
+    def frame_presented(self):
+        """Record command-to-present latency for everything applied this frame."""
+        if not self._presented:
+            return
+        now = time.perf_counter()
+        latencies = self._latencies
+        for received in self._presented:
+            latencies[self._latency_count % len(latencies)] = now - received
+            self._latency_count += 1
+        self._presented.clear()
+
+    def latency_stats(self):
+        """Command-to-present latency percentiles in milliseconds, and the sample count."""
+        count = min(self._latency_count, len(self._latencies))
+        values = sorted(v * 1e3 for v in self._latencies[:count])
+        stats = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+        stats["samples"] = self._latency_count
+        stats["coalesced"] = self.coalesced
+        stats["rejected"] = self.rejected
+        return stats
+
+    def report(self):
+        stats = self.latency_stats()
+        return (f"{stats['samples']} commands, command-to-frame latency "
+                + " ".join(f"p{p} {stats[f'p{p}']:.2f} ms" for p in PERCENTILES)
+                + f", {stats['coalesced']} targets coalesced, {stats['rejected']} rejected")
+
+
+class LizardDriver:
+    """Where a server-controlled lizard is heading: one target or a waypoint path.
+
+    A lizard moves on to the next waypoint once its head is within
+    ``reach`` pixels of the current one; a looping path starts over at the
+    end, otherwise the lizard stays on the last point.
+    """
+
+    def __init__(self, reach=20):
+        self.reach = reach
+        self.target = None
+        self.waypoints = []
+        self.index = 0
+        self.loop = False
+
+    def set_target(self, x, y):
+        self.target = (x, y)
+        self.waypoints = []
+
+    def set_waypoints(self, points, loop=False):
+        self.waypoints = [(float(x), float(y)) for x, y in points]
+        self.index = 0
+        self.loop = loop
+        self.target = self.waypoints[0] if self.waypoints else None
+
+    def target_for(self, lizard):
+        """Target for this step, advancing along the path when a waypoint is reached."""
+        if self.waypoints:
+            x, y = self.waypoints[self.index]
+            head = lizard.spine_positions[0]
+            dx, dy = x - head[0], y - head[1]
+            if dx * dx + dy * dy <= self.reach * self.reach:
+                if self.index + 1 < len(self.waypoints):
+                    self.index += 1
+                elif self.loop:
+                    self.index = 0
+                self.target = self.waypoints[self.index]
+        return self.target
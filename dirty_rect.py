@@ -0,0 +1,91 @@
+"""
+Dirty-Rectangle Renderer
+Clears and presents only the screen regions the lizards and HUD touched
+in the previous and current frame, instead of filling and flipping the
+whole window every frame
+"""
+import pygame
+
+from skeleton_lizard import BACKGROUND_COLOR
+
+
+def merge_rects(rects):
+    """Union overlapping rects so each screen region is pushed only once."""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        # Keep absorbing overlapping rects until this one stops growing
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    """Tracks the regions drawn each frame and updates only those.
+
+    Usage per frame: ``begin(surface)`` clears last frame's regions, draw
+    the scene, then ``present(rects)`` with the rects it returned.
+    """
+
+    def __init__(self, background=BACKGROUND_COLOR, padding=2, max_coverage=0.5, max_rects=256):
+        self.background = background
+        # Extra pixels around each rect to cover antialiasing and rounding
+        self.padding = padding
+        # Above this fraction of the screen a single flip is cheaper
+        self.max_coverage = max_coverage
+        # Above this many rects merging costs more than it saves
+        self.max_rects = max_rects
+        self.previous = []
+        self.full_redraw = True
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """Force a full clear and flip on the next frame (resize, fullscreen)."""
+        self.full_redraw = True
+
+    def begin(self, surface):
+        """Clear what was drawn last frame, or the whole surface if invalidated."""
+        if self.full_redraw:
+            surface.fill(self.background)
+        else:
+            for rect in self.previous:
+                surface.fill(self.background, rect)
+
+    def present(self, surface, rects):
+        """Push the union of last frame's and this frame's regions to the display."""
+        dirty = self.track(surface, rects)
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def track(self, surface, rects):
+        """Record this frame's regions without touching the display.
+
+        Returns the rects that changed since the last frame, or ``None`` when
+        the whole surface should be pushed.
+        """
+        bounds = surface.get_rect()
+        if len(rects) > self.max_rects:
+            # Too many separate bodies, treat the whole screen as dirty
+            current = [bounds]
+        else:
+            current = merge_rects([rect.inflate(self.padding * 2, self.padding * 2).clip(bounds)
+                                   for rect in rects])
+        dirty = None
+        if not self.full_redraw:
+            dirty = merge_rects(self.previous + current)
+            area = sum(rect.width * rect.height for rect in dirty)
+            if area > bounds.width * bounds.height * self.max_coverage:
+                dirty = None
+        if dirty is None:
+            self.full_frames += 1
+        else:
+            self.partial_frames += 1
+        self.previous = current
+        self.full_redraw = False
+        return dirty
@@ -0,0 +1,57 @@
+"""
+Frame Budget Controller
+Smooths measured frame work times and decides when the loop has been over
+or comfortably under its frame budget for long enough to shed or restore
+load, for controllers such as the render scale and the detail tiers
+"""
+
+# Signals from FrameBudget.update
+OVER, STEADY, UNDER = 1, 0, -1
+
+
+class FrameBudget:
+    """Moving average of frame work time against ``1 / target_fps`` seconds.
+
+    ``update`` signals ``OVER`` once the average has been above
+    ``high_water`` of the budget for ``patience`` frames, and ``UNDER`` once
+    it has been below ``low_water`` for ``4 * patience`` frames, so a
+    controller sheds load quickly but restores it only when there is clear
+    headroom. The signal repeats every frame until the caller acts on it and
+    calls ``reset``.
+    """
+
+    def __init__(self, target_fps=60, patience=30, high_water=0.9, low_water=0.6):
+        self.seconds = 1.0 / target_fps
+        self.patience = patience
+        self.high_water = high_water
+        self.low_water = low_water
+        self.average = None
+        self.over = 0
+        self.under = 0
+
+    def update(self, work_time):
+        """Feed one frame's work time in seconds; returns ``OVER``, ``UNDER`` or ``STEADY``."""
+        if self.average is None:
+            self.average = work_time
+        else:
+            self.average += (work_time - self.average) * 0.1
+
+        if self.average > self.seconds * self.high_water:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.seconds * self.low_water:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.patience:
+            return OVER
+        if self.under >= self.patience * 4:
+            return UNDER
+        return STEADY
+
+    def reset(self):
+        """Start measuring from scratch, e.g. after the load was changed."""
+        self.over = self.under = 0
+        self.average = None
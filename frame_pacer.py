@@ -0,0 +1,78 @@
+"""
+Adaptive Frame Pacing
+Runs the main loop at full rate while anything moves and drops to a low
+tick rate, blocking on the event queue, once the scene has gone idle
+"""
+import time
+
+import pygame
+
+ACTIVE = "active"
+IDLE = "idle"
+
+
+class FramePacer:
+    """Chooses how long to wait between frames from how busy the scene is.
+
+    The scene counts as idle when there is no input, the cursor has not
+    moved and no lizard is moving; with pacing enabled the app sets
+    ``still_at_rest`` on its lizards, so an idle scene has nothing to
+    redraw. After ``idle_after`` seconds of that the
+    pacer waits on ``pygame.event.wait`` for up to one idle frame, so any
+    input wakes it immediately and the next frame runs at full rate.
+    ``idle_fps`` of 0 blocks until input arrives.
+    """
+
+    def __init__(self, clock, fps=60, idle_fps=10, idle_after=0.5, blocking=True):
+        self.clock = clock
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        # Replays have no live input to wake on, so they only lower the tick rate
+        self.blocking = blocking
+        self.state = ACTIVE
+        self.idle_since = None
+        self.time_in_state = {ACTIVE: 0.0, IDLE: 0.0}
+        self.frames_in_state = {ACTIVE: 0, IDLE: 0}
+        self._frame_start = time.perf_counter()
+
+    def update(self, scene_idle):
+        """Record whether this frame was idle; returns the pacing state."""
+        now = time.perf_counter()
+        if not scene_idle:
+            self.idle_since = None
+            self.state = ACTIVE
+        elif self.idle_since is None:
+            self.idle_since = now
+        elif now - self.idle_since >= self.idle_after:
+            self.state = IDLE
+        return self.state
+
+    def wait(self):
+        """Sleep until the next frame is due for the current state."""
+        if self.state == ACTIVE:
+            self.clock.tick(self.fps)
+        elif self.blocking:
+            timeout = int(1000 / self.idle_fps) if self.idle_fps else 0
+            event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+            if event.type != pygame.NOEVENT:
+                # Hand the wake-up event back to the main loop
+                pygame.event.post(event)
+            self.clock.tick()
+        else:
+            self.clock.tick(self.idle_fps)
+
+        now = time.perf_counter()
+        self.time_in_state[self.state] += now - self._frame_start
+        self.frames_in_state[self.state] += 1
+        self._frame_start = now
+
+    def report(self):
+        """One line per pacing state with wall time, share and frame count."""
+        total = sum(self.time_in_state.values()) or 1.0
+        lines = []
+        for state in (ACTIVE, IDLE):
+            seconds = self.time_in_state[state]
+            lines.append(f"{state:>6}: {seconds:8.1f} s ({seconds / total:6.1%}), "
+                         f"{self.frames_in_state[state]} frames")
+        return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+Per-Phase Frame Profiler
+Times every phase of the main loop into a fixed-size ring buffer, shows
+p50/p95/p99 per phase in an on-screen overlay and dumps the buffer as a
+Chrome trace (chrome://tracing, Perfetto) and as CSV
+"""
+import csv
+import json
+import time
+from array import array
+
+import pygame
+
+# Main loop phases, in loop order
+PHASES = ("events", "update", "pose", "draw", "hud", "present", "wait")
+EVENTS, UPDATE, POSE, DRAW, HUD, PRESENT, WAIT = range(len(PHASES))
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class FrameProfiler:
+    """Ring buffer of phase boundary timestamps for the last ``capacity`` frames.
+
+    Call ``begin_frame`` at the top of the loop and ``mark(phase)`` at the
+    end of each phase in ``PHASES``, in order. Timestamps are stored in a
+    preallocated ``array('d')``, so recording a frame allocates nothing.
+    """
+
+    def __init__(self, capacity=600, overlay_interval=30):
+        self.capacity = capacity
+        self.stride = len(PHASES) + 1
+        # Row per frame: frame start, then the end time of every phase
+        self.marks = array('d', bytes(8 * self.stride * capacity))
+        self.frames = 0
+        self._row = 0
+        self.origin = time.perf_counter()
+
+        self.overlay_visible = False
+        # Percentiles are recomputed every overlay_interval frames, not per frame
+        self.overlay_interval = overlay_interval
+        self._overlay = None
+        self._font = None
+
+    def begin_frame(self):
+        self._row = (self.frames % self.capacity) * self.stride
+        self.marks[self._row] = time.perf_counter()
+
+    def mark(self, phase):
+        """Close phase number ``phase`` (an index into ``PHASES``)."""
+        self.marks[self._row + phase + 1] = time.perf_counter()
+        if phase == len(PHASES) - 1:
+            self.frames += 1
+
+    def recorded_rows(self):
+        """Buffer offsets of the recorded frames, oldest first."""
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+        return [(frame % self.capacity) * self.stride for frame in range(first, self.frames)]
+
+    def durations(self):
+        """Per-phase lists of durations in milliseconds, plus the frame total."""
+        marks = self.marks
+        result = {name: [] for name in PHASES + ("frame",)}
+        for row in self.recorded_rows():
+            for i, name in enumerate(PHASES):
+                result[name].append((marks[row + i + 1] - marks[row + i]) * 1e3)
+            result["frame"].append((marks[row + len(PHASES)] - marks[row]) * 1e3)
+        return result
+
+    def stats(self):
+        """``{phase: (p50, p95, p99)}`` in milliseconds over the buffer."""
+        return {name: tuple(percentile(sorted(values), p) for p in PERCENTILES)
+                for name, values in self.durations().items()}
+
+    def report(self):
+        """Percentile table in milliseconds, one line per phase."""
+        lines = [f"{'ms':>8} " + " ".join(f"{'p' + str(p):>6}" for p in PERCENTILES)]
+        for name, values in self.stats().items():
+            lines.append(f"{name:>8} " + " ".join(f"{v:6.2f}" for v in values))
+        return "\n".join(lines)
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self._overlay = None
+
+    def draw_overlay(self, surface):
+        """Draw the percentile table in the top right corner; returns its Rects."""
+        if not self.overlay_visible:
+            return []
+        if self._overlay is None or self.frames % self.overlay_interval == 0:
+            self._overlay = self._render_overlay()
+        position = (surface.get_width() - self._overlay.get_width() - 10, 10)
+        return [surface.blit(self._overlay, position)]
+
+    def _render_overlay(self):
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, 20)
+        rows = [self._font.render(line, True, (200, 200, 200), (0, 0, 0))
+                for line in self.report().splitlines()]
+        overlay = pygame.Surface((max(row.get_width() for row in rows),
+                                  sum(row.get_height() for row in rows)))
+        y = 0
+        for row in rows:
+            overlay.blit(row, (0, y))
+            y += row.get_height()
+        return overlay
+
+    def dump(self, prefix):
+        """Write the buffer to ``prefix.json`` (Chrome trace) and ``prefix.csv``."""
+        marks = self.marks
+        rows = self.recorded_rows()
+
+        events = []
+        for row in rows:
+            for i, name in enumerate(PHASES):
+                start = marks[row + i]
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": (start - self.origin) * 1e6,
+                               "dur": (marks[row + i + 1] - start) * 1e6})
+        with open(prefix + ".json", "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+        with open(prefix + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "start_ms"] + [name + "_ms" for name in PHASES] + ["frame_ms"])
+            first = self.frames - len(rows)
+            for n, row in enumerate(rows):
+                start = marks[row]
+                writer.writerow([first + n, f"{(start - self.origin) * 1e3:.3f}"]
+                                + [f"{(marks[row + i + 1] - marks[row + i]) * 1e3:.3f}"
+                                   for i in range(len(PHASES))]
+                                + [f"{(marks[row + len(PHASES)] - start) * 1e3:.3f}"])
+        return prefix + ".json", prefix + ".csv"
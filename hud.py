@@ -0,0 +1,100 @@
+"""
+Retained HUD Layer
+Fonts are loaded once and rendered text is cached, so the main loop does no
+font I/O or glyph rasterization while the HUD text stays the same. The HUD
+lines are composited into one transparent overlay that is rebuilt only when
+the text changes and drawn over the scene with a single blit
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by ``(text, color, size)``.
+
+    Fonts (pygame's default font at each ``size``) are loaded on first use
+    and kept; at most ``max_surfaces`` rendered texts are kept.
+    """
+
+    def __init__(self, max_surfaces=256):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()  # Deferred by a fast start
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, color, size=24):
+        """Antialiased ``text`` on a transparent background."""
+        key = (text, color, size)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+# Shared cache used when a caller does not provide its own
+default_text_cache = TextCache()
+
+
+class Hud:
+    """Lines of text composited as one retained, transparent overlay.
+
+    Usage per frame: ``set_line`` for anything that may have changed, then
+    after drawing the scene ``draw(surface)``, which returns the rect it
+    covered. Treat that rect like the scene's: it has to be cleared with
+    the scene before the next ``draw``, so the overlay never blends over an
+    earlier copy of itself.
+    """
+
+    def __init__(self, position=(10, 10), size=24, line_spacing=25, cache=None):
+        self.position = position
+        self.size = size
+        self.line_spacing = line_spacing
+        self.cache = cache or default_text_cache
+        self.lines = []
+        self.overlay = None
+        self.rect = None
+        self.changed = True
+        self.rebuilds = 0
+
+    def set_line(self, index, text, color=(255, 255, 255)):
+        """Set line ``index``; the overlay is rebuilt only if the text or color changed."""
+        while len(self.lines) <= index:
+            self.lines.append(("", color))
+        if self.lines[index] != (text, color):
+            self.lines[index] = (text, color)
+            self.changed = True
+
+    def _rebuild(self):
+        rows = [self.cache.render(text, color, self.size) for text, color in self.lines if text]
+        width = max((row.get_width() for row in rows), default=1)
+        height = self.line_spacing * (len(rows) - 1) + rows[-1].get_height() if rows else 1
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        for n, row in enumerate(rows):
+            self.overlay.blit(row, (0, n * self.line_spacing))
+        self.rect = self.overlay.get_rect(topleft=self.position)
+        self.changed = False
+        self.rebuilds += 1
+
+    def draw(self, surface):
+        """Blit the overlay over the drawn scene; returns the rect it covered."""
+        if self.changed:
+            self._rebuild()
+        return surface.blit(self.overlay, self.rect)
@@ -0,0 +1,134 @@
+"""
+Input Trace Recording and Replay
+Records the per-frame tick, cursor position, key presses and resizes to a
+compact fixed-record binary file, and replays it in place of the live mouse
+and clock so any run can be reproduced exactly
+"""
+import mmap
+import struct
+
+import pygame
+
+MAGIC = b"LZTR"
+VERSION = 1
+
+# File header: magic, version, record size
+HEADER = struct.Struct("<4sHH")
+# Record: type, tick in ms, two type-specific integers
+RECORD = struct.Struct("<BxxxIii")
+
+# Record types; a FRAME record closes the inputs of one frame
+FRAME, KEYDOWN, RESIZE, QUIT = range(4)
+
+
+class TraceError(Exception):
+    """Raised for files that are not input traces."""
+
+
+class TraceRecorder:
+    """Appends fixed-size records to a trace file."""
+
+    def __init__(self, filename):
+        self.file = open(filename, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.frames = 0
+
+    def record_events(self, tick, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.file.write(RECORD.pack(KEYDOWN, tick, event.key, 0))
+            elif event.type == pygame.VIDEORESIZE:
+                self.file.write(RECORD.pack(RESIZE, tick, event.w, event.h))
+            elif event.type == pygame.QUIT:
+                self.file.write(RECORD.pack(QUIT, tick, 0, 0))
+
+    def record_frame(self, tick, mouse_x, mouse_y):
+        self.file.write(RECORD.pack(FRAME, tick, mouse_x, mouse_y))
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+
+class TraceReader:
+    """Memory-mapped view of a trace file; records are decoded on demand."""
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise TraceError(f"{filename}: file too short for a trace header")
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise TraceError(f"{filename}: not an input trace")
+        if version != VERSION:
+            raise TraceError(f"{filename}: unsupported trace version {version}")
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """Decode record ``index`` as ``(type, tick, a, b)``."""
+        return RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)
+
+    def frames(self):
+        """Yield ``(tick, (mouse_x, mouse_y), events)`` for every recorded frame."""
+        events = []
+        for kind, tick, a, b in RECORD.iter_unpack(memoryview(self.map)[HEADER.size:
+                                                                        HEADER.size + self.count * RECORD.size]):
+            if kind == FRAME:
+                yield tick, (a, b), events
+                events = []
+            elif kind == KEYDOWN:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=a))
+            elif kind == RESIZE:
+                events.append(pygame.event.Event(pygame.VIDEORESIZE, w=a, h=b, size=(a, b)))
+            elif kind == QUIT:
+                events.append(pygame.event.Event(pygame.QUIT))
+
+    def close(self):
+        self.map.close()
+
+
+class LiveInput:
+    """Samples the real event queue, mouse and clock, optionally recording them."""
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+
+    def poll(self):
+        """Return ``(tick, (mouse_x, mouse_y), events)`` for this frame."""
+        events = pygame.event.get()
+        tick = pygame.time.get_ticks()
+        mouse_pos = pygame.mouse.get_pos()
+        if self.recorder is not None:
+            self.recorder.record_events(tick, events)
+            self.recorder.record_frame(tick, *mouse_pos)
+        return tick, mouse_pos, events
+
+    def close(self):
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+class ReplayInput:
+    """Feeds a recorded trace to the main loop instead of the live input."""
+
+    def __init__(self, filename):
+        self.reader = TraceReader(filename)
+        self._frames = self.reader.frames()
+
+    def poll(self):
+        """Next recorded frame, or ``None`` once the trace is exhausted."""
+        try:
+            tick, mouse_pos, events = next(self._frames)
+        except StopIteration:
+            return None
+        # Closing the window still works while replaying
+        live = [event for event in pygame.event.get() if event.type == pygame.QUIT]
+        return tick, mouse_pos, events + live
+
+    def close(self):
+        self._frames.close()
+        self.reader.close()
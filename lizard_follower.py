@@ -5,395 +5,609 @@ Supports fullscreen mode
 Legs only move when lizard is moving
 Realistic acceleration/deceleration and posture
 """
+import time
+
+# Taken before any other import, for --startup-report
+SCRIPT_START = time.perf_counter()
+
+import argparse
+import hashlib
+import multiprocessing
+import struct
 import pygame
-import math
-import colorsys
-
-# Initialize Pygame
-pygame.init()
-
-# Set window icon if available
-try:
-    icon = pygame.image.load('lizard_icon.ico')
-    pygame.display.set_icon(icon)
-except:
-    pass  # Icon file not found, continue without it
-
-# Get display info for fullscreen
-display_info = pygame.display.Info()
-FULLSCREEN_WIDTH = display_info.current_w
-FULLSCREEN_HEIGHT = display_info.current_h
-
-# Window settings
-WIDTH, HEIGHT = 1024, 768
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Skeleton Lizard Follower - Press F11 for Fullscreen")
-clock = pygame.time.Clock()
-
-# Fullscreen state
-is_fullscreen = False
-
-def toggle_fullscreen():
-    global screen, is_fullscreen, WIDTH, HEIGHT
-    is_fullscreen = not is_fullscreen
-    if is_fullscreen:
-        screen = pygame.display.set_mode((FULLSCREEN_WIDTH, FULLSCREEN_HEIGHT), pygame.FULLSCREEN)
-        WIDTH, HEIGHT = FULLSCREEN_WIDTH, FULLSCREEN_HEIGHT
-    else:
-        WIDTH, HEIGHT = 1024, 768
-        screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-    return screen
-
-# Skeleton Lizard properties
-class SkeletonLizard:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.target_x = x
-        self.target_y = y
-        
-        # Movement properties with acceleration
-        self.current_speed = 0
-        self.min_speed = 0.5
-        self.walk_speed = 3
-        self.run_speed = 8
-        self.acceleration = 0.3
-        self.deceleration = 0.5
-        
-        # Distance thresholds (in pixels, roughly 10cm = 380 pixels at 96 DPI)
-        self.run_distance = 380  # Start running when far away
-        self.walk_distance = 100  # Walk when closer
-        self.stop_distance = 10   # Stop when very close
-        
-        # Skeleton proportions (longer lizard)
-        self.spine_segments = 8
-        self.segment_length = 20
-        self.min_segment_length = 15  # Minimum to prevent overlap
-        self.max_segment_length = 25  # Maximum stretch
-        self.head_size = 25
-        self.skull_width = 20
-        self.leg_pairs = 3
-        self.leg_length = 40
-        self.leg_joint_length = 25
-        self.rib_length = 15
-        
-        # Spine position history for smooth body movement
-        self.spine_positions = [[x, y] for _ in range(self.spine_segments)]
-        
-        self.hue = 0
-        
-        # Movement tracking
-        self.is_moving = False
-        self.is_running = False
-        self.velocity = 0
-        self.last_position = [x, y]
-        self.movement_threshold = 0.3
-        
-    def update(self, target_x, target_y):
-        # Calculate distance to target
-        dx = target_x - self.spine_positions[0][0]
-        dy = target_y - self.spine_positions[0][1]
-        dist_to_target = math.sqrt(dx**2 + dy**2)
-        
-        # Determine target speed based on distance
-        if dist_to_target > self.run_distance:
-            # Far away - run
-            target_speed = self.run_speed
-            self.is_running = True
-        elif dist_to_target > self.walk_distance:
-            # Medium distance - walk
-            target_speed = self.walk_speed
-            self.is_running = False
-        elif dist_to_target > self.stop_distance:
-            # Close - slow walk
-            target_speed = self.min_speed + (self.walk_speed - self.min_speed) * (dist_to_target / self.walk_distance)
-            self.is_running = False
+
+from skeleton_lizard import (
+    BACKGROUND_COLOR,
+    SEPARATION_RADIUS,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+    SkeletonLizard,
+    get_status,
+    init_pygame,
+    separate_lizards,
+)
+from dirty_rect import DirtyRectRenderer
+from frame_pacer import FramePacer
+from frame_profiler import DRAW, EVENTS, HUD, POSE, PRESENT, UPDATE, WAIT, FrameProfiler
+from hud import Hud
+from input_trace import LiveInput, ReplayInput, TraceRecorder
+from lod import LodController
+from low_latency import CursorPredictor, JustInTimePacer, LatencyProbe
+from render_scaler import RenderScaler
+from sim_clock import SimulationClock
+from sprite_atlas import default_atlas
+from startup_timer import StartupTimer
+
+
+class LizardApp:
+    def __init__(self, headless=False, lizard_count=1, fps=60, time_scale=1.0, dirty_rects=True,
+                 record=None, replay=None, adaptive_pacing=False, idle_fps=10, serpent=None,
+                 fast_start=False, startup=None, profile=False, profile_prefix="lizard_profile",
+                 dynamic_resolution=False, min_render_scale=0.5, smooth_scaling=False,
+                 sim_process=False, control_port=None, low_latency=False, predict=None,
+                 latency_probe=False, lod=False):
+        # Phase timings up to the first presented frame, if requested
+        self.startup = startup
+
+        # Initialize Pygame; a fast start brings up only the display
+        self.fast_start = fast_start
+        init_pygame(headless, fast=fast_start)
+        self._mark_startup("pygame init")
+
+        # A fast start sets the icon after the first frame and probes the
+        # fullscreen size on the first toggle
+        self.fullscreen_size = None
+        if not fast_start:
+            self.load_icon()
+            self.probe_fullscreen()
+
+        # Window settings
+        self.width, self.height = WINDOW_WIDTH, WINDOW_HEIGHT
+        self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+        pygame.display.set_caption("Skeleton Lizard Follower - Press F11 for Fullscreen")
+        self._mark_startup("window")
+        # Every joint sprite a full-resolution lizard draws, so the first
+        # seconds of hue changes do not rasterize mid-frame; a fast start
+        # rasterizes them on first use instead
+        if not fast_start:
+            default_atlas.warm()
+            self._mark_startup("joint sprites")
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        # Physics runs in fixed steps, decoupled from the render rate
+        self.sim_clock = SimulationClock(time_scale=time_scale)
+        self.last_tick = None
+
+        # Input comes from the live mouse and clock, a recorded trace, or the
+        # latency probe's synthetic cursor
+        self.probe = None
+        if replay is not None:
+            self.input = ReplayInput(replay)
+        elif latency_probe:
+            self.input = self.probe = LatencyProbe((self.width // 2, self.height // 2))
         else:
-            # Very close - stop
-            target_speed = 0
-            self.is_running = False
-        
-        # Smooth acceleration/deceleration
-        if self.current_speed < target_speed:
-            self.current_speed += self.acceleration
-            if self.current_speed > target_speed:
-                self.current_speed = target_speed
-        elif self.current_speed > target_speed:
-            self.current_speed -= self.deceleration
-            if self.current_speed < target_speed:
-                self.current_speed = target_speed
-        
-        # Track movement for animation
-        head_movement = math.sqrt(
-            (self.spine_positions[0][0] - self.last_position[0])**2 +
-            (self.spine_positions[0][1] - self.last_position[1])**2
-        )
-        
-        # Update movement state
-        if head_movement > self.movement_threshold:
-            self.is_moving = True
-            self.velocity = head_movement
+            self.input = LiveInput(TraceRecorder(record) if record is not None else None)
+
+        # Extrapolate the cursor this many milliseconds ahead, if enabled
+        self.predictor = CursorPredictor() if predict else None
+        self.predict_ms = predict
+
+        # Drop to a low tick rate while nothing moves, if enabled
+        self.pacer = None
+        if adaptive_pacing:
+            self.pacer = FramePacer(self.clock, fps, idle_fps, blocking=replay is None)
+        # Or wait before sampling input instead of after present
+        self.jit_pacer = JustInTimePacer(self.clock, fps) if low_latency else None
+        self.last_mouse = None
+
+        # Per-phase frame timings; None costs one check per phase
+        self.profiler = FrameProfiler() if profile else None
+        self.profile_prefix = profile_prefix
+
+        # Render below window resolution when frames run over budget, if enabled
+        self.scaler = None
+        if dynamic_resolution:
+            self.scaler = RenderScaler(fps or 60, min_scale=min_render_scale, smooth=smooth_scaling)
+
+        # Draw crowds and slow frames at lower detail, if enabled
+        self.lod = LodController(fps or 60) if lod else None
+
+        # Only redraw the regions that changed, unless disabled
+        self.renderer = DirtyRectRenderer() if dirty_rects else None
+
+        # Instructions and status, re-rendered only when the status changes
+        self.hud = Hud()
+        self.hud.set_line(0, "F11: Fullscreen | ESC: Exit", (100, 100, 100))
+
+        # Fullscreen state
+        self.is_fullscreen = False
+
+        # Create lizards at center, or a single long-chain serpent; with a
+        # simulation process the lizards here are only drawing shells
+        self.sim_process = None
+        if sim_process:
+            from sim_worker import SimulationProcess
+
+            self.sim_process = SimulationProcess([(self.width // 2, self.height // 2)] * lizard_count,
+                                                 time_scale=time_scale, still_at_rest=adaptive_pacing)
+            self.lizards = self.sim_process.lizards
+        elif serpent is not None:
+            # NumPy is only needed for the serpent's array solver
+            from serpent import Serpent
+
+            self.lizards = [Serpent(self.width // 2, self.height // 2, serpent)]
+        else:
+            self.lizards = [SkeletonLizard(self.width // 2, self.height // 2)
+                            for _ in range(lizard_count)]
+        # Idle pacing needs lizards at rest to stop animating too
+        self.still_at_rest = adaptive_pacing
+        for lizard in self.lizards:
+            lizard.still_at_rest = adaptive_pacing
+        self.running = True
+
+        # Spatial hash over all lizards, created once there is a crowd
+        self.grid = None
+        self.hovered = -1
+
+        # Local control server; lizards it drives follow their own targets
+        self.server = None
+        self.lizard_ids = {n: lizard for n, lizard in enumerate(self.lizards)}
+        self.next_lizard_id = len(self.lizards)
+        self.drivers = {}
+        if control_port is not None:
+            from control_server import ControlServer
+
+            # Commands wake the loop even while idle pacing blocks on events
+            wake_event = pygame.event.Event(pygame.event.custom_type())
+            self.server = ControlServer(port=control_port,
+                                        wake=lambda: pygame.event.post(wake_event)).start()
+            self.server.lizard_ids = frozenset(self.lizard_ids)
+        self._mark_startup("scene setup")
+
+    def _mark_startup(self, phase):
+        if self.startup is not None:
+            self.startup.mark(phase)
+
+    def load_icon(self):
+        """Set the window icon if the icon file is available."""
+        try:
+            icon = pygame.image.load('lizard_icon.ico')
+            pygame.display.set_icon(icon)
+        except (pygame.error, FileNotFoundError):
+            pass  # Icon file not found, continue without it
+
+    def probe_fullscreen(self):
+        """Desktop size used for fullscreen mode.
+
+        Uses the desktop mode rather than ``display.Info``, which reports the
+        window size once a window exists (a fast start probes on first F11).
+        """
+        if self.fullscreen_size is None:
+            self.fullscreen_size = pygame.display.get_desktop_sizes()[0]
+        return self.fullscreen_size
+
+    def separate_lizards(self):
+        """Push overlapping lizards apart using a spatial hash of every node."""
+        self.grid = separate_lizards(self.lizards, self.grid)
+
+    def apply_commands(self):
+        """Apply every command the control server queued since the last frame."""
+        from control_server import LizardDriver
+
+        commands, targets = self.server.drain()
+        for key, (x, y, received) in targets.items():
+            lizard = self.lizard_ids.get(key)
+            if lizard is not None:
+                self.drivers.setdefault(lizard, LizardDriver()).set_target(x, y)
+                self.server.applied(received)
+        for command in commands:
+            try:
+                result = self.apply_command(command.name, command.args)
+            except (KeyError, TypeError, ValueError) as error:
+                command.reply(error=str(error))
+            else:
+                command.reply(result)
+            self.server.applied(command.received)
+
+    def apply_command(self, name, args):
+        """Run one control command checked by ``control_server.check_args``.
+
+        Raises ValueError (or KeyError/TypeError) for commands that do not
+        fit the current scene, such as an unknown lizard id.
+        """
+        from control_server import LizardDriver
+
+        if name == "spawn":
+            x = float(args.get("x", self.width // 2))
+            y = float(args.get("y", self.height // 2))
+            segments = int(args.get("segments", 8))
+            lizard = SkeletonLizard(x, y, segments)
+            lizard.still_at_rest = self.still_at_rest
+            lizard.compute_pose()
+            self.lizards.append(lizard)
+            lizard_id = self.next_lizard_id
+            self.next_lizard_id += 1
+            self.lizard_ids[lizard_id] = lizard
+            self.server.lizard_ids = frozenset(self.lizard_ids)
+            return {"lizard": lizard_id}
+        if name == "stats":
+            stats = self.server.latency_stats()
+            stats["fps"] = self.clock.get_fps()
+            stats["lizards"] = len(self.lizards)
+            return stats
+        if name == "query" and "lizard" not in args:
+            return [self.lizard_state(key, lizard) for key, lizard in self.lizard_ids.items()]
+
+        key = args["lizard"]
+        lizard = self.lizard_ids.get(key)
+        if lizard is None:
+            raise ValueError(f"no lizard {key}")
+        if name == "remove":
+            if len(self.lizards) == 1:
+                raise ValueError("cannot remove the last lizard")
+            del self.lizard_ids[key]
+            self.server.lizard_ids = frozenset(self.lizard_ids)
+            self.drivers.pop(lizard, None)
+            self.lizards.remove(lizard)
+            # The spatial hash still holds the old lizard indices
+            self.grid = None
+            self.hovered = -1
+            self.invalidate()
+            return None
+        if name == "waypoints":
+            # An empty path hands the lizard back to the mouse
+            if args["points"]:
+                self.drivers.setdefault(lizard, LizardDriver()).set_waypoints(
+                    args["points"], bool(args.get("loop", False)))
+            else:
+                self.drivers.pop(lizard, None)
+            return None
+        if name == "speed":
+            if "walk_speed" in args:
+                lizard.walk_speed = float(args["walk_speed"])
+            if "run_speed" in args:
+                lizard.run_speed = float(args["run_speed"])
+            return None
+        return self.lizard_state(key, lizard)
+
+    def lizard_state(self, key, lizard):
+        """JSON-ready state of one lizard for the control server."""
+        driver = self.drivers.get(lizard)
+        head_x, head_y = lizard.spine_positions[0]
+        return {
+            "lizard": key,
+            "x": head_x,
+            "y": head_y,
+            "status": get_status(lizard)[0],
+            "speed": lizard.current_speed,
+            "walk_speed": lizard.walk_speed,
+            "run_speed": lizard.run_speed,
+            "hue": lizard.hue,
+            "target": None if driver is None else driver.target,
+        }
+
+    def toggle_fullscreen(self):
+        self.is_fullscreen = not self.is_fullscreen
+        if self.is_fullscreen:
+            self.width, self.height = self.probe_fullscreen()
+            self.screen = pygame.display.set_mode((self.width, self.height), pygame.FULLSCREEN)
         else:
-            self.is_moving = False
-            self.velocity = 0
-        
-        # Store current position for next frame
-        self.last_position = [self.spine_positions[0][0], self.spine_positions[0][1]]
-        
-        # Move head towards target with current speed
-        if dist_to_target > self.stop_distance:
-            move_x = (dx / dist_to_target) * self.current_speed
-            move_y = (dy / dist_to_target) * self.current_speed
-            self.spine_positions[0][0] += move_x
-            self.spine_positions[0][1] += move_y
-        
-        # Update spine segments with proper spacing to prevent overlap
-        for i in range(1, self.spine_segments):
-            dx = self.spine_positions[i-1][0] - self.spine_positions[i][0]
-            dy = self.spine_positions[i-1][1] - self.spine_positions[i][1]
-            current_dist = math.sqrt(dx**2 + dy**2)
-            
-            # Enforce minimum distance to prevent overlap
-            if current_dist < self.min_segment_length:
-                # Push segment away to maintain minimum distance
-                if current_dist > 0:
-                    ratio = (self.min_segment_length - current_dist) / current_dist
-                    self.spine_positions[i][0] -= dx * ratio * 0.5
-                    self.spine_positions[i][1] -= dy * ratio * 0.5
-            elif current_dist > self.max_segment_length:
-                # Pull segment closer if too far
-                ratio = (current_dist - self.segment_length) / current_dist
-                self.spine_positions[i][0] += dx * ratio * 0.6
-                self.spine_positions[i][1] += dy * ratio * 0.6
-            elif current_dist > self.segment_length:
-                # Normal following behavior
-                ratio = (current_dist - self.segment_length) / current_dist
-                self.spine_positions[i][0] += dx * ratio * 0.5
-                self.spine_positions[i][1] += dy * ratio * 0.5
-        
-        # Update head position
-        self.x = self.spine_positions[0][0]
-        self.y = self.spine_positions[0][1]
-        
-        # Update color hue - faster when running
-        if self.is_moving:
-            if self.is_running:
-                self.hue = (self.hue + 0.8) % 360  # Faster color change when running
+            self.width, self.height = WINDOW_WIDTH, WINDOW_HEIGHT
+            self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+        self.invalidate()
+        return self.screen
+
+    def invalidate(self):
+        """Fall back to a full redraw on the next frame."""
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+    def handle_events(self, events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    if self.is_fullscreen:
+                        self.toggle_fullscreen()
+                    else:
+                        self.running = False
+                elif event.key == pygame.K_F11:
+                    self.toggle_fullscreen()
+                elif event.key == pygame.K_F3 and self.profiler is not None:
+                    self.profiler.toggle_overlay()
+                    self.invalidate()
+                elif event.key == pygame.K_F4 and self.profiler is not None:
+                    paths = self.profiler.dump(f"{self.profile_prefix}_{self.profiler.frames:06d}")
+                    print("Profile written to " + " and ".join(paths))
+            if event.type == pygame.VIDEORESIZE:
+                self.width, self.height = event.w, event.h
+                self.invalidate()
+            if event.type == pygame.VIDEOEXPOSE:
+                self.invalidate()
+
+    def run(self, max_frames=None):
+        # Main game loop
+        frame = 0
+        profiler = self.profiler
+        scaler = self.scaler
+        while self.running:
+            if profiler is not None:
+                profiler.begin_frame()
+            if scaler is not None or self.lod is not None:
+                frame_start = time.perf_counter()
+            # Events, clock tick and mouse position, sampled once per frame
+            polled = self.input.poll()
+            if polled is None:
+                break  # Replay finished
+            tick, (mouse_x, mouse_y), events = polled
+            self.handle_events(events)
+            if self.server is not None:
+                self.apply_commands()
+            if profiler is not None:
+                profiler.mark(EVENTS)
+            cursor_moved = (mouse_x, mouse_y) != self.last_mouse
+            self.last_mouse = (mouse_x, mouse_y)
+            if self.predictor is not None:
+                # Aim at where the cursor will be by the time this frame is seen
+                self.predictor.add(tick, mouse_x, mouse_y)
+                mouse_x, mouse_y = self.predictor.predict(self.predict_ms)
+
+            if self.sim_process is not None:
+                # The worker steps on its own clock; take its latest poses
+                self.sim_process.send_target(mouse_x, mouse_y)
+                self.hovered = self.sim_process.sync()
             else:
-                self.hue = (self.hue + 0.3) % 360
-        
-    def get_color(self):
-        rgb = colorsys.hsv_to_rgb(self.hue / 360, 0.9, 1.0)
-        return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
-    
-    def draw(self, surface):
-        color = self.get_color()
-        
-        # Calculate angle towards target
-        dx = pygame.mouse.get_pos()[0] - self.x
-        dy = pygame.mouse.get_pos()[1] - self.y
-        head_angle = math.atan2(dy, dx)
-        
-        time = pygame.time.get_ticks() * 0.005
-        
-        # Draw tail
-        tail_segments = 5
-        last_spine_idx = self.spine_segments - 1
-        
-        if last_spine_idx >= 1:
-            dx = self.spine_positions[last_spine_idx][0] - self.spine_positions[last_spine_idx-1][0]
-            dy = self.spine_positions[last_spine_idx][1] - self.spine_positions[last_spine_idx-1][1]
-            tail_angle = math.atan2(dy, dx)
-            
-            prev_x = self.spine_positions[last_spine_idx][0]
-            prev_y = self.spine_positions[last_spine_idx][1]
-            
-            for i in range(tail_segments):
-                wave = math.sin(time * 2 - i * 0.5) * 3
-                segment_length = 10
-                
-                tail_x = prev_x + math.cos(tail_angle) * segment_length
-                tail_y = prev_y + math.sin(tail_angle) * segment_length + wave
-                
-                tail_size = max(2, 8 - i)
-                
-                pygame.draw.line(surface, color, (int(prev_x), int(prev_y)), 
-                               (int(tail_x), int(tail_y)), 3)
-                pygame.draw.circle(surface, color, (int(tail_x), int(tail_y)), tail_size)
-                
-                prev_x = tail_x
-                prev_y = tail_y
-        
-        # Draw spine
-        for i in range(len(self.spine_positions) - 1):
-            start_pos = (int(self.spine_positions[i][0]), int(self.spine_positions[i][1]))
-            end_pos = (int(self.spine_positions[i+1][0]), int(self.spine_positions[i+1][1]))
-            pygame.draw.line(surface, color, start_pos, end_pos, 4)
-            pygame.draw.circle(surface, color, start_pos, 6)
-        
-        last_pos = (int(self.spine_positions[-1][0]), int(self.spine_positions[-1][1]))
-        pygame.draw.circle(surface, color, last_pos, 6)
-        
-        # Draw ribs
-        for i in range(1, self.spine_segments - 1):
-            if i % 2 == 0:
-                spine_x, spine_y = self.spine_positions[i]
-                
-                if i < self.spine_segments - 1:
-                    dx = self.spine_positions[i+1][0] - spine_x
-                    dy = self.spine_positions[i+1][1] - spine_y
-                    spine_angle = math.atan2(dy, dx)
-                    
-                    rib_angle_l = spine_angle + math.pi / 2
-                    rib_end_x_l = spine_x + math.cos(rib_angle_l) * self.rib_length
-                    rib_end_y_l = spine_y + math.sin(rib_angle_l) * self.rib_length
-                    pygame.draw.line(surface, color, (int(spine_x), int(spine_y)), 
-                                   (int(rib_end_x_l), int(rib_end_y_l)), 2)
-                    
-                    rib_angle_r = spine_angle - math.pi / 2
-                    rib_end_x_r = spine_x + math.cos(rib_angle_r) * self.rib_length
-                    rib_end_y_r = spine_y + math.sin(rib_angle_r) * self.rib_length
-                    pygame.draw.line(surface, color, (int(spine_x), int(spine_y)), 
-                                   (int(rib_end_x_r), int(rib_end_y_r)), 2)
-        
-        # Draw 6 legs - Animation speed based on movement
-        leg_positions = [1, 3, 5]
-        
-        for idx, seg_idx in enumerate(leg_positions):
-            if seg_idx < len(self.spine_positions):
-                spine_x, spine_y = self.spine_positions[seg_idx]
-                
-                if seg_idx < self.spine_segments - 1:
-                    dx = self.spine_positions[seg_idx+1][0] - spine_x
-                    dy = self.spine_positions[seg_idx+1][1] - spine_y
-                    spine_angle = math.atan2(dy, dx)
-                    
-                    # Animate legs based on speed - faster when running
-                    if self.is_moving:
-                        if self.is_running:
-                            leg_wave = math.sin(time * 6 + idx * 2) * 0.6  # Faster leg movement when running
+                # Update lizards in fixed steps for the time since the last frame
+                elapsed = 0 if self.last_tick is None else tick - self.last_tick
+                self.last_tick = tick
+                steps = self.sim_clock.advance(elapsed / 1000)
+                drivers = self.drivers
+                for _ in range(steps):
+                    for lizard in self.lizards:
+                        driver = drivers.get(lizard) if drivers else None
+                        target = None if driver is None else driver.target_for(lizard)
+                        if target is None:
+                            lizard.update(mouse_x, mouse_y, self.sim_clock.dt)
                         else:
-                            leg_wave = math.sin(time * 3 + idx * 2) * 0.4  # Normal walking
+                            lizard.update(target[0], target[1], self.sim_clock.dt)
+                    if len(self.lizards) > 1:
+                        self.separate_lizards()
+
+                # Which lizard is under the cursor, if any
+                if self.grid is not None:
+                    self.hovered = self.grid.owner_at(mouse_x, mouse_y, SEPARATION_RADIUS)
+            if frame == 0:
+                self._mark_startup("first frame: input and update")
+            if profiler is not None:
+                profiler.mark(UPDATE)
+
+            # Draw, interpolated between the last two simulated poses
+            alpha = self.sim_clock.alpha
+            # The simulation stays in window pixels; below full resolution
+            # only drawing is scaled into the smaller render target
+            scaled = scaler is not None and scaler.scaled
+            canvas = scaler.canvas(self.screen) if scaled else self.screen
+            scale = scaler.scale if scaled else 1.0
+            if self.renderer is not None:
+                self.renderer.begin(canvas)
+            else:
+                canvas.fill(BACKGROUND_COLOR)  # Black background
+            hovered = self.hovered if 0 <= self.hovered < len(self.lizards) else 0
+            status, status_color = get_status(self.lizards[hovered])
+            self.hud.set_line(1, f"Status: {status}", status_color)
+            # Pose stage: skeleton geometry once per lizard, looking at the cursor,
+            # at the detail tier each lizard is drawn with
+            if self.lod is not None:
+                self.lod.assign(self.lizards, scale)
+            if self.sim_process is None:
+                for lizard in self.lizards:
+                    if lizard in self.drivers:
+                        lizard.compute_pose(alpha)  # Looks at its own target
                     else:
-                        leg_wave = 0  # Static legs when stopped
-                    
-                    # Left leg
-                    leg_angle_l = spine_angle + math.pi / 2 + leg_wave
-                    joint_x_l = spine_x + math.cos(leg_angle_l) * self.leg_length
-                    joint_y_l = spine_y + math.sin(leg_angle_l) * self.leg_length
-                    
-                    pygame.draw.line(surface, color, (int(spine_x), int(spine_y)), 
-                                   (int(joint_x_l), int(joint_y_l)), 4)
-                    pygame.draw.circle(surface, color, (int(joint_x_l), int(joint_y_l)), 5)
-                    
-                    foot_angle_l = leg_angle_l + math.pi / 4 + leg_wave * 0.5
-                    foot_x_l = joint_x_l + math.cos(foot_angle_l) * self.leg_joint_length
-                    foot_y_l = joint_y_l + math.sin(foot_angle_l) * self.leg_joint_length
-                    pygame.draw.line(surface, color, (int(joint_x_l), int(joint_y_l)), 
-                                   (int(foot_x_l), int(foot_y_l)), 4)
-                    pygame.draw.circle(surface, color, (int(foot_x_l), int(foot_y_l)), 4)
-                    
-                    # Right leg
-                    leg_angle_r = spine_angle - math.pi / 2 - leg_wave
-                    joint_x_r = spine_x + math.cos(leg_angle_r) * self.leg_length
-                    joint_y_r = spine_y + math.sin(leg_angle_r) * self.leg_length
-                    
-                    pygame.draw.line(surface, color, (int(spine_x), int(spine_y)), 
-                                   (int(joint_x_r), int(joint_y_r)), 4)
-                    pygame.draw.circle(surface, color, (int(joint_x_r), int(joint_y_r)), 5)
-                    
-                    foot_angle_r = leg_angle_r - math.pi / 4 - leg_wave * 0.5
-                    foot_x_r = joint_x_r + math.cos(foot_angle_r) * self.leg_joint_length
-                    foot_y_r = joint_y_r + math.sin(foot_angle_r) * self.leg_joint_length
-                    pygame.draw.line(surface, color, (int(joint_x_r), int(joint_y_r)), 
-                                   (int(foot_x_r), int(foot_y_r)), 4)
-                    pygame.draw.circle(surface, color, (int(foot_x_r), int(foot_y_r)), 4)
-        
-        # Draw skull
-        head_x, head_y = self.spine_positions[0]
-        
-        skull_points = [
-            (head_x + math.cos(head_angle) * self.head_size, 
-             head_y + math.sin(head_angle) * self.head_size),
-            (head_x + math.cos(head_angle + 2.5) * self.skull_width, 
-             head_y + math.sin(head_angle + 2.5) * self.skull_width),
-            (head_x + math.cos(head_angle - 2.5) * self.skull_width, 
-             head_y + math.sin(head_angle - 2.5) * self.skull_width),
-        ]
-        pygame.draw.polygon(surface, color, skull_points, 3)
-        
-        # Eye sockets
-        eye_offset = 8
-        eye1_x = head_x + math.cos(head_angle + 0.4) * eye_offset
-        eye1_y = head_y + math.sin(head_angle + 0.4) * eye_offset
-        eye2_x = head_x + math.cos(head_angle - 0.4) * eye_offset
-        eye2_y = head_y + math.sin(head_angle - 0.4) * eye_offset
-        
-        pygame.draw.circle(surface, color, (int(eye1_x), int(eye1_y)), 6, 2)
-        pygame.draw.circle(surface, color, (int(eye2_x), int(eye2_y)), 6, 2)
-        
-        # Eye pupils
-        pygame.draw.circle(surface, (0, 0, 0), (int(eye1_x), int(eye1_y)), 3)
-        pygame.draw.circle(surface, (0, 0, 0), (int(eye2_x), int(eye2_y)), 3)
-        
-        # Jaw line
-        jaw_length = self.head_size * 0.8
-        jaw_x = head_x + math.cos(head_angle) * jaw_length
-        jaw_y = head_y + math.sin(head_angle) * jaw_length
-        pygame.draw.line(surface, color, (int(head_x), int(head_y)), 
-                        (int(jaw_x), int(jaw_y)), 3)
-
-# Create lizard at center
-lizard = SkeletonLizard(WIDTH // 2, HEIGHT // 2)
-
-# Main game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                if is_fullscreen:
-                    toggle_fullscreen()
-                else:
-                    running = False
-            elif event.key == pygame.K_F11:
-                toggle_fullscreen()
-        if event.type == pygame.VIDEORESIZE:
-            WIDTH, HEIGHT = event.w, event.h
-    
-    # Get mouse position
-    mouse_x, mouse_y = pygame.mouse.get_pos()
-    
-    # Update lizard
-    lizard.update(mouse_x, mouse_y)
-    
-    # Draw
-    screen.fill((0, 0, 0))  # Black background
-    lizard.draw(screen)
-    
-    # Draw instructions and status
-    font = pygame.font.Font(None, 24)
-    text = font.render("F11: Fullscreen | ESC: Exit", True, (100, 100, 100))
-    screen.blit(text, (10, 10))
-    
-    # Show movement status
-    if lizard.is_running:
-        status = "RUNNING"
-        status_color = (255, 100, 100)
-    elif lizard.is_moving:
-        status = "WALKING"
-        status_color = (100, 255, 100)
-    else:
-        status = "STATIC"
-        status_color = (100, 100, 255)
-    
-    status_text = font.render(f"Status: {status}", True, status_color)
-    screen.blit(status_text, (10, 35))
-    
-    # Update display
-    pygame.display.flip()
-    clock.tick(60)  # 60 FPS for smooth animation
-
-pygame.quit()
+                        lizard.compute_pose(alpha, mouse_x, mouse_y)
+            if profiler is not None:
+                profiler.mark(POSE)
+
+            # Joints of every lizard go out in a single blits call
+            joints = []
+            dirty = [lizard.draw(canvas, joints, scale=scale) for lizard in self.lizards]
+            canvas.blits(joints, doreturn=False)
+            if scaled:
+                # Dirty rects only save clears on the target; upscaling covers
+                # the screen, and the HUD goes on top at full resolution
+                if self.renderer is not None:
+                    self.renderer.track(canvas, dirty)
+                scaler.present(self.screen)
+                hud_surface = self.screen
+            else:
+                hud_surface = canvas
+            if profiler is not None:
+                profiler.mark(DRAW)
+
+            # Draw instructions and status over the scene; its rect is cleared
+            # with the lizards' next frame
+            dirty.append(self.hud.draw(hud_surface))
+            if profiler is not None:
+                dirty += profiler.draw_overlay(hud_surface)
+                profiler.mark(HUD)
+            if frame == 0:
+                self._mark_startup("first frame: draw")
+
+            # Update display
+            if scaled:
+                pygame.display.flip()
+            elif self.renderer is not None:
+                self.renderer.present(self.screen, dirty)
+            else:
+                pygame.display.flip()
+            if self.server is not None:
+                self.server.frame_presented()
+            if self.probe is not None:
+                self.probe.presented(mouse_x, mouse_y)
+            if profiler is not None:
+                profiler.mark(PRESENT)
+            if frame == 0:
+                self._mark_startup("first frame: present")
+                if self.fast_start:
+                    # Window is up; the icon no longer delays the first frame
+                    self.load_icon()
+                    self._mark_startup("deferred icon")
+            if scaler is not None or self.lod is not None:
+                work_time = time.perf_counter() - frame_start
+                if self.lod is not None:
+                    self.lod.update(work_time)
+                if scaler is not None:
+                    if scaler.update(work_time) is not None:
+                        self.invalidate()  # New render target size
+            if self.pacer is not None:
+                # Idle: no input, cursor still and every lizard at rest
+                self.pacer.update(not events and not cursor_moved and all(
+                    not lizard.is_moving and lizard.current_speed == 0 for lizard in self.lizards))
+                self.pacer.wait()
+            elif self.jit_pacer is not None:
+                self.jit_pacer.wait()
+            else:
+                self.clock.tick(self.fps)  # Render rate cap, 60 FPS by default
+            if profiler is not None:
+                profiler.mark(WAIT)
+
+            frame += 1
+            if max_frames is not None and frame >= max_frames:
+                self.running = False
+
+        self.input.close()
+        if self.server is not None:
+            self.server.stop()
+        if self.sim_process is not None:
+            self.sim_process.close()
+        pygame.quit()
+
+    def state_digest(self):
+        """Hash of every lizard's spine and hue, to check replays match exactly."""
+        digest = hashlib.sha1()
+        for lizard in self.lizards:
+            for x, y in lizard.spine_positions:
+                digest.update(struct.pack("<dd", x, y))
+            digest.update(struct.pack("<d", lizard.hue))
+        return digest.hexdigest()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Skeleton lizard that follows the mouse cursor")
+    parser.add_argument("--headless", action="store_true",
+                        help="run with SDL's dummy video driver (no window)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="exit after this many frames")
+    parser.add_argument("--lizards", type=int, default=1,
+                        help="number of lizards to simulate")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render frame rate cap (0 = uncapped); physics always runs at 60 Hz")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="simulation speed relative to real time")
+    parser.add_argument("--no-dirty-rects", dest="dirty_rects", action="store_false",
+                        help="fill and flip the whole screen every frame")
+    parser.add_argument("--adaptive-pacing", action="store_true",
+                        help="lower the frame rate while the lizard and cursor are still")
+    parser.add_argument("--idle-fps", type=int, default=10,
+                        help="frame rate while idle with --adaptive-pacing (0 = wait for input)")
+    parser.add_argument("--serpent", type=int, metavar="SEGMENTS", default=None,
+                        help="replace the lizards with one serpent of this many spine segments")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="start only the display, deferring fonts, the icon and the fullscreen probe")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup phase took up to the first presented frame")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each main loop phase (F3: overlay, F4: dump trace and CSV)")
+    parser.add_argument("--profile-prefix", default="lizard_profile",
+                        help="file name prefix for profile dumps")
+    parser.add_argument("--dynamic-resolution", action="store_true",
+                        help="render below window resolution when frames miss the --fps budget")
+    parser.add_argument("--min-render-scale", type=float, default=0.5,
+                        help="lowest render resolution as a fraction of the window")
+    parser.add_argument("--smooth-scaling", action="store_true",
+                        help="upscale with smoothscale instead of nearest neighbour")
+    parser.add_argument("--sim-process", action="store_true",
+                        help="run the simulation in a worker process (not with --serpent, --replay "
+                             "or --dynamic-resolution)")
+    parser.add_argument("--control-port", type=int, default=None, metavar="PORT",
+                        help="serve JSON-lines control commands on 127.0.0.1:PORT")
+    parser.add_argument("--lod", action="store_true",
+                        help="draw lizards at lower detail in large crowds or when frames miss the "
+                             "--fps budget (not with --serpent)")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="sleep before sampling input instead of after present, so each "
+                             "frame draws the freshest cursor position")
+    parser.add_argument("--predict", type=float, default=None, metavar="MS",
+                        help="extrapolate the cursor this many milliseconds ahead")
+    trace = parser.add_mutually_exclusive_group()
+    trace.add_argument("--record", metavar="FILE", default=None,
+                       help="record input (ticks, mouse, keys, resizes) to a trace file")
+    trace.add_argument("--replay", metavar="FILE", default=None,
+                       help="replay a recorded trace instead of live input")
+    trace.add_argument("--latency-probe", action="store_true",
+                       help="drive the cursor along a known path and report input-to-present latency")
+    args = parser.parse_args(argv)
+    if args.lizards < 1:
+        parser.error("--lizards must be at least 1")
+    if args.serpent is not None and args.serpent < 2:
+        parser.error("--serpent needs at least 2 segments")
+    if args.sim_process and (args.serpent or args.replay or args.dynamic_resolution
+                             or args.control_port is not None):
+        parser.error("--sim-process cannot be combined with --serpent, --replay, "
+                     "--dynamic-resolution or --control-port")
+    if args.lod and args.serpent:
+        parser.error("--lod cannot be combined with --serpent")
+    if args.low_latency and args.adaptive_pacing:
+        parser.error("--low-latency cannot be combined with --adaptive-pacing")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    startup = None
+    if args.startup_report:
+        startup = StartupTimer(SCRIPT_START)
+        startup.mark("imports")
+    app = LizardApp(headless=args.headless, lizard_count=args.lizards,
+                    fps=args.fps, time_scale=args.time_scale, dirty_rects=args.dirty_rects,
+                    record=args.record, replay=args.replay,
+                    adaptive_pacing=args.adaptive_pacing, idle_fps=args.idle_fps,
+                    serpent=args.serpent, fast_start=args.fast_start, startup=startup,
+                    profile=args.profile, profile_prefix=args.profile_prefix,
+                    dynamic_resolution=args.dynamic_resolution,
+                    min_render_scale=args.min_render_scale, smooth_scaling=args.smooth_scaling,
+                    sim_process=args.sim_process, control_port=args.control_port,
+                    low_latency=args.low_latency, predict=args.predict,
+                    latency_probe=args.latency_probe, lod=args.lod)
+    app.run(max_frames=args.frames)
+    if startup is not None:
+        print("Startup time per phase:")
+        print(startup.report())
+    if (args.record or args.replay) and app.sim_process is None:
+        print(f"State digest: {app.state_digest()}")
+    if app.server is not None:
+        print(f"Control server: {app.server.report()}")
+    if app.sim_process is not None:
+        print(f"Simulation process: {app.sim_process.steps} steps, "
+              f"{app.sim_process.repeated_frames} frames repeated the previous pose")
+    if app.probe is not None:
+        print("Latency probe:")
+        print(app.probe.report())
+    if app.profiler is not None:
+        print("Frame time per phase:")
+        print(app.profiler.report())
+        print(f"Joint sprites: {default_atlas.report()}")
+    if app.lod is not None:
+        print(f"Detail tiers: {app.lod.report()}")
+    if app.scaler is not None:
+        print(f"Render scale: {app.scaler.scale:.3f} after {app.scaler.changes} changes")
+    if app.pacer is not None:
+        print("Time per pacing state:")
+        print(app.pacer.report())
+
+
+if __name__ == "__main__":
+    # Lets --sim-process workers start in a frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,246 @@
+"""
+Vectorized Skeleton Lizard Swarm Engine
+Simulates many skeleton lizards at once using NumPy arrays
+Every lizard follows the same rules as SkeletonLizard.update
+"""
+import numpy as np
+
+from pose import TAIL_SEGMENTS
+from sim_clock import SIM_DT, SIM_RATE
+from spatial_hash import SpatialHash, separation, tail_nodes
+
+
+class LizardSwarm:
+    """Batched follow-the-cursor simulation for N lizards.
+
+    State lives in contiguous float arrays: ``spines`` is ``(N, segments, 2)``
+    and the per-lizard speed, hue and movement flags are ``(N,)`` arrays.
+    One call to ``update`` advances every lizard by one simulation step.
+    """
+
+    def __init__(self, positions, spine_segments=8, solver="sequential",
+                 solver_iterations=256, solver_tolerance=1e-3):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        count = len(positions)
+
+        # Movement properties with acceleration (same defaults as SkeletonLizard)
+        self.min_speed = 0.5
+        self.walk_speed = np.full(count, 3.0)
+        self.run_speed = np.full(count, 8.0)
+        self.acceleration = 0.3
+        self.deceleration = 0.5
+
+        # Distance thresholds
+        self.run_distance = 380
+        self.walk_distance = 100
+        self.stop_distance = 10
+
+        # Skeleton proportions
+        self.spine_segments = spine_segments
+        self.segment_length = 20
+        self.min_segment_length = 15
+        self.max_segment_length = 25
+
+        # Segment constraint solver: "sequential" walks the spine one segment
+        # at a time like SkeletonLizard; "jacobi" relaxes the whole chain in
+        # array passes, for very long spines
+        if solver not in ("sequential", "jacobi"):
+            raise ValueError(f"Unknown solver: {solver}")
+        self.solver = solver
+        self.solver_iterations = solver_iterations
+        self.solver_tolerance = solver_tolerance
+        self.solver_passes = 0
+
+        # Spine positions for every lizard, all segments start on the head
+        self.spines = np.repeat(positions[:, np.newaxis, :], spine_segments, axis=1)
+
+        self.current_speed = np.zeros(count)
+        self.hue = np.zeros(count)
+
+        # Movement tracking
+        self.is_moving = np.zeros(count, dtype=bool)
+        self.is_running = np.zeros(count, dtype=bool)
+        self.velocity = np.zeros(count)
+        self.last_position = positions.copy()
+        self.movement_threshold = 0.3
+
+        # Lizard-to-lizard separation over a spatial hash of all nodes
+        self.separation_radius = 20
+        self.separation_strength = 0.5
+        self.grid = SpatialHash(cell_size=self.separation_radius)
+
+    def __len__(self):
+        return len(self.spines)
+
+    @property
+    def heads(self):
+        """View of every lizard's head position, shape ``(N, 2)``."""
+        return self.spines[:, 0, :]
+
+    def update(self, targets, dt=SIM_DT):
+        """Advance every lizard one step of ``dt`` seconds towards ``targets``.
+
+        ``targets`` is either a single ``(x, y)`` point shared by all lizards
+        or an ``(N, 2)`` array with one target per lizard.
+        """
+        # Movement constants are per 1/SIM_RATE step; scale them to dt
+        step = dt * SIM_RATE
+        targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), self.heads.shape)
+        heads = self.heads
+
+        # Calculate distance to target
+        delta = targets - heads
+        dist_to_target = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+
+        # Determine target speed based on distance
+        far = dist_to_target > self.run_distance
+        medium = ~far & (dist_to_target > self.walk_distance)
+        close = ~far & ~medium & (dist_to_target > self.stop_distance)
+
+        target_speed = np.zeros(len(self))
+        target_speed[far] = self.run_speed[far]
+        target_speed[medium] = self.walk_speed[medium]
+        target_speed[close] = self.min_speed + (self.walk_speed[close] - self.min_speed) * (
+            dist_to_target[close] / self.walk_distance)
+        self.is_running = far
+
+        # Smooth acceleration/deceleration
+        speed = self.current_speed
+        speeding_up = speed < target_speed
+        slowing_down = speed > target_speed
+        speed = np.where(speeding_up, np.minimum(speed + self.acceleration * step, target_speed), speed)
+        speed = np.where(slowing_down, np.maximum(speed - self.deceleration * step, target_speed), speed)
+        self.current_speed = speed
+
+        # Track movement for animation
+        moved = heads - self.last_position
+        head_movement = np.sqrt(moved[:, 0] ** 2 + moved[:, 1] ** 2)
+        self.is_moving = head_movement > self.movement_threshold * step
+        self.velocity = np.where(self.is_moving, head_movement / step, 0.0)
+        self.last_position = heads.copy()
+
+        # Move head towards target with current speed
+        stepping = dist_to_target > self.stop_distance
+        safe_dist = np.where(stepping, dist_to_target, 1.0)
+        head_step = np.where(stepping[:, np.newaxis],
+                             delta / safe_dist[:, np.newaxis] * (speed * step)[:, np.newaxis], 0.0)
+        heads += head_step
+
+        # Update spine segments with the min/max/rest-length rule
+        if self.solver == "jacobi":
+            self._solve_jacobi()
+        else:
+            self._solve_sequential()
+
+        # Update color hue - faster when running
+        hue_step = np.where(self.is_running, 0.8, 0.3) * step
+        self.hue = np.where(self.is_moving, (self.hue + hue_step) % 360, self.hue)
+
+    def _follow_factors(self, current_dist):
+        """Ratio and weight of the min/max/rest-length rule for each segment."""
+        too_close = (current_dist < self.min_segment_length) & (current_dist > 0)
+        too_far = current_dist > self.max_segment_length
+        following = ~too_far & (current_dist > self.segment_length)
+
+        safe_dist = np.where(current_dist > 0, current_dist, 1.0)
+        # Push segment away to maintain minimum distance, otherwise pull it
+        # closer (harder when stretched past the maximum) to the rest length
+        ratio = np.where(too_close, (self.min_segment_length - current_dist) / safe_dist,
+                         np.where(too_far | following, (current_dist - self.segment_length) / safe_dist, 0.0))
+        weight = np.select([too_close, too_far, following], [-0.5, 0.6, 0.5], 0.0)
+        return ratio, weight
+
+    def _solve_sequential(self):
+        # Each segment follows the already-moved one in front of it, so the
+        # loop runs over segments, batched over lizards
+        for i in range(1, self.spine_segments):
+            delta = self.spines[:, i - 1, :] - self.spines[:, i, :]
+            current_dist = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+            ratio, weight = self._follow_factors(current_dist)
+            self.spines[:, i, :] += delta * ratio[:, np.newaxis] * weight[:, np.newaxis]
+        self.solver_passes = 1
+
+    def _solve_jacobi(self):
+        # Every segment at once: each pass moves a segment from its position
+        # before the solve towards where its leader ended the previous pass.
+        # Pass k matches the sequential loop for the first k segments, and a
+        # leader's correction shrinks by about half per link behind it, so
+        # later passes only revisit the window of segments behind a leader
+        # that moved by more than solver_tolerance in the previous pass.
+        spines = self.spines
+        base_x = spines[:, 1:, 0].copy()
+        base_y = spines[:, 1:, 1].copy()
+        low, high = 0, self.spine_segments - 1
+        passes = 0
+        for passes in range(1, self.solver_iterations + 1):
+            # Window [low, high) of followers; follower j is spine node j + 1
+            x = spines[:, low + 1:high + 1, 0]
+            y = spines[:, low + 1:high + 1, 1]
+            dx = spines[:, low:high, 0] - base_x[:, low:high]
+            dy = spines[:, low:high, 1] - base_y[:, low:high]
+            dist = np.sqrt(dx * dx + dy * dy)
+            # Same rule as the sequential loop in one expression: pull by 0.5
+            # of the stretch past the rest length (0.6 past the maximum), push
+            # by 0.5 of the overlap below the minimum, otherwise hold still
+            factor = np.maximum(dist - self.segment_length, 0.0)
+            factor *= np.where(dist > self.max_segment_length, 0.6, 0.5)
+            factor += np.minimum(dist - self.min_segment_length, 0.0) * 0.5
+            # Coincident segments have a zero delta, so they stay put
+            np.divide(factor, dist, out=factor, where=dist > 0)
+            solved_x = base_x[:, low:high] + dx * factor
+            solved_y = base_y[:, low:high] + dy * factor
+            moved = ((np.abs(solved_x - x) > self.solver_tolerance)
+                     | (np.abs(solved_y - y) > self.solver_tolerance)).any(axis=0)
+            x[:] = solved_x
+            y[:] = solved_y
+            if not moved.any():
+                break
+            # The first `passes` followers are final; the next pass covers
+            # the followers of every node that just moved
+            high = min(low + int(np.flatnonzero(moved)[-1]) + 2, self.spine_segments - 1)
+            low = passes
+            if low >= high:
+                break
+        self.solver_passes = passes
+
+    def tail_points(self):
+        """Tail nodes continuing straight along each last segment, ``(N, 5, 2)``."""
+        return tail_nodes(self.spines[:, -1, :], self.spines[:, -2, :])
+
+    def build_grid(self):
+        """Index every spine and tail node; spine nodes come first."""
+        count = len(self)
+        points = np.concatenate([self.spines.reshape(-1, 2), self.tail_points().reshape(-1, 2)])
+        owners = np.concatenate([np.repeat(np.arange(count), self.spine_segments),
+                                 np.repeat(np.arange(count), TAIL_SEGMENTS)])
+        self.grid.build(points, owners)
+        return self.grid
+
+    def separate(self):
+        """Push apart overlapping lizards; call after ``update`` each step."""
+        if len(self) < 2:
+            return
+        grid = self.build_grid()
+        spine_nodes = self.spines.size // 2
+        # Tails follow the spine, so only spine nodes are moved
+        displacement = separation(grid, self.separation_radius, self.separation_strength, spine_nodes)
+        self.spines += displacement[:spine_nodes].reshape(self.spines.shape)
+
+    def lizard_at(self, x, y, radius=12):
+        """Index of the lizard under ``(x, y)``, or -1; uses the last built grid."""
+        return self.grid.owner_at(x, y, radius)
+
+    def get_colors(self):
+        """RGB colors for every lizard, shape ``(N, 3)`` of ``uint8``."""
+        # Vectorized colorsys.hsv_to_rgb with saturation 0.9 and value 1.0
+        h = (self.hue / 360) * 6.0
+        i = np.floor(h).astype(int) % 6
+        f = h - np.floor(h)
+        v = np.ones_like(h)
+        p = np.full_like(h, 1.0 - 0.9)
+        q = 1.0 - 0.9 * f
+        t = 1.0 - 0.9 * (1.0 - f)
+        r = np.choose(i, [v, q, p, p, t, v])
+        g = np.choose(i, [t, v, v, q, p, p])
+        b = np.choose(i, [p, p, t, v, v, q])
+        return (np.stack([r, g, b], axis=1) * 255).astype(np.uint8)
@@ -0,0 +1,91 @@
+"""
+Level of Detail
+Picks how much of each lizard's skeleton to draw: the full skeleton, spine
+and legs, a spine polyline or a single dot. The tier follows the lizard's
+size in render pixels, how many lizards there are and recent frame times,
+with hysteresis so lizards do not pop between tiers
+"""
+from frame_budget import OVER, UNDER, FrameBudget
+from pose import DOT, FULL, TAIL_SEGMENT_LENGTH, TAIL_SEGMENTS
+
+TIER_NAMES = ("full", "body", "line", "dot")
+
+
+class LodController:
+    """Per-lizard detail tiers from size, crowd size and frame time.
+
+    Each lizard gets a size tier from its full length (spine plus tail)
+    drawn at the render scale, against ``size_thresholds`` (the smallest
+    length for full, body and line detail); the length does not change as
+    the lizard curls, so only the render scale moves it. On top of that
+    every lizard is pushed down one tier per ``count_thresholds`` entry the
+    crowd has reached, and one more per step of frame-time pressure from a
+    ``FrameBudget``: pressure rises after ``patience`` frames over
+    ``high_water`` of the budget and falls after ``4 * patience`` frames
+    under ``low_water``. Size and count tiers only get finer once the value
+    is ``hysteresis`` past the threshold they fell below.
+    """
+
+    def __init__(self, target_fps=60, size_thresholds=(100, 50, 20), count_thresholds=(200, 800, 3000),
+                 hysteresis=0.2, patience=30, high_water=0.9, low_water=0.6):
+        self.budget = FrameBudget(target_fps, patience, high_water, low_water)
+        self.size_thresholds = size_thresholds
+        self.count_thresholds = count_thresholds
+        self.hysteresis = hysteresis
+
+        self.count_bias = 0
+        self.pressure = 0
+        # Size tier of each lizard seen in the last ``assign``
+        self.size_tiers = {}
+        # Lizards drawn at each tier in the last ``assign``
+        self.counts = [0] * len(TIER_NAMES)
+
+    def update(self, work_time):
+        """Feed one frame's work time in seconds; returns the pressure, 0 to 3."""
+        signal = self.budget.update(work_time)
+        if signal == OVER and self.pressure < DOT:
+            self.pressure += 1
+        elif signal == UNDER and self.pressure > 0:
+            self.pressure -= 1
+        else:
+            return self.pressure
+        # Give the new tiers time to show up in the frame times
+        self.budget.reset()
+        return self.pressure
+
+    def _coarsen(self, tier, value, thresholds):
+        """Move ``tier`` along ``thresholds`` (descending) with hysteresis."""
+        while tier < len(thresholds) and value < thresholds[tier]:
+            tier += 1
+        while tier > 0 and value >= thresholds[tier - 1] * (1 + self.hysteresis):
+            tier -= 1
+        return tier
+
+    def assign(self, lizards, scale=1.0):
+        """Set ``lod`` on every lizard for this frame, drawn at ``scale``."""
+        # More lizards push every tier down; count thresholds ascend
+        bias = self.count_bias
+        count = len(lizards)
+        thresholds = self.count_thresholds
+        while bias < len(thresholds) and count >= thresholds[bias]:
+            bias += 1
+        while bias > 0 and count < thresholds[bias - 1] * (1 - self.hysteresis):
+            bias -= 1
+        self.count_bias = bias
+        bias += self.pressure
+
+        old_tiers = self.size_tiers
+        size_tiers = self.size_tiers = {}
+        counts = self.counts = [0] * len(TIER_NAMES)
+        for lizard in lizards:
+            size = (lizard.spine_segments * lizard.segment_length
+                    + TAIL_SEGMENTS * TAIL_SEGMENT_LENGTH) * scale
+            size_tier = size_tiers[lizard] = self._coarsen(
+                old_tiers.get(lizard, FULL), size, self.size_thresholds)
+            tier = min(size_tier + bias, DOT)
+            lizard.lod = tier
+            counts[tier] += 1
+
+    def report(self):
+        return (", ".join(f"{count} {name}" for name, count in zip(TIER_NAMES, self.counts))
+                + f" (crowd bias {self.count_bias}, frame-time pressure {self.pressure})")
@@ -0,0 +1,167 @@
+"""
+Low-Latency Input
+Just-in-time frame pacing that samples the cursor as late as possible
+before a frame is drawn, cursor extrapolation to hide the remaining lag,
+and a probe that feeds a known cursor path and measures input-to-present
+latency and how far the drawn cursor trails the real one
+"""
+import math
+import threading
+import time
+from array import array
+
+import pygame
+
+from frame_profiler import PERCENTILES, percentile
+
+
+class CursorPredictor:
+    """Extrapolates the cursor from its recent samples.
+
+    Samples are ``(tick_ms, x, y)``, so a replayed trace predicts exactly
+    as the live run did. Velocity is measured over the last ``window_ms``
+    and the prediction is capped at ``max_distance`` pixels; a cursor that
+    did not move since the last sample is not extrapolated at all.
+    """
+
+    def __init__(self, window_ms=50, max_distance=120):
+        self.window_ms = window_ms
+        self.max_distance = max_distance
+        self.samples = []
+
+    def add(self, tick, x, y):
+        samples = self.samples
+        samples.append((tick, x, y))
+        # Keep one sample older than the window to measure across it
+        while len(samples) > 2 and tick - samples[1][0] >= self.window_ms:
+            samples.pop(0)
+
+    def predict(self, lead_ms):
+        """Cursor position ``lead_ms`` after the newest sample."""
+        tick, x, y = self.samples[-1]
+        if len(self.samples) < 2 or self.samples[-2][1:] == (x, y):
+            return x, y
+        first_tick, first_x, first_y = self.samples[0]
+        span = tick - first_tick
+        if span <= 0:
+            return x, y
+        dx = (x - first_x) / span * lead_ms
+        dy = (y - first_y) / span * lead_ms
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance > self.max_distance:
+            dx *= self.max_distance / distance
+            dy *= self.max_distance / distance
+        return x + dx, y + dy
+
+
+class JustInTimePacer:
+    """Delays the start of each frame so its input is sampled as late as possible.
+
+    ``clock.tick`` sleeps right after present, so the next frame samples the
+    cursor early and then waits for its slot. This pacer instead aims each
+    present at a fixed schedule and sleeps until that present is due minus
+    the expected work time (a moving average of sample-to-present) and a
+    safety ``margin``; the cursor is then sampled right before the work that
+    uses it.
+    """
+
+    def __init__(self, clock, fps=60, margin=0.002):
+        self.clock = clock
+        self.period = 1.0 / fps if fps else 0.0
+        self.margin = margin
+        self.work = 0.0
+        self.next_present = None
+        self.started = None
+
+    def wait(self):
+        """Call after present; sleeps until the next frame should sample its input."""
+        now = time.perf_counter()
+        if self.started is not None:
+            work = now - self.started
+            self.work = work if not self.work else self.work + (work - self.work) * 0.1
+        if self.next_present is None or now > self.next_present:
+            self.next_present = now  # First frame, or running late: restart the schedule
+        self.next_present += self.period
+        delay = self.next_present - self.work - self.margin - now
+        if delay > 0:
+            time.sleep(delay)
+        self.clock.tick()  # Keeps Clock.get_fps meaningful
+        self.started = time.perf_counter()
+
+
+class LatencyProbe:
+    """Synthetic cursor for measuring input-to-present latency.
+
+    A thread posts ``MOUSEMOTION`` events along a circle at ``rate`` Hz,
+    each stamped with the time it was sent. Used in place of the live input,
+    it reports for every event how long it took until a frame using it was
+    presented, and for every frame how far the cursor position it used
+    (after any prediction) was from the real cursor at present time.
+    """
+
+    def __init__(self, center, radius=200, period=1.0, rate=500, samples=4096):
+        self.center = center
+        self.radius = radius
+        self.period = period
+        self.rate = rate
+        self.start = time.perf_counter()
+        self.position = self.path(self.start)
+        self.latencies = array('d', bytes(8 * samples))
+        self.errors = array('d', bytes(8 * samples))
+        self.latency_count = 0
+        self.error_count = 0
+        self._consumed = []
+        self._running = True
+        self._thread = threading.Thread(target=self._feed, name="latency-probe", daemon=True)
+        self._thread.start()
+
+    def path(self, t):
+        angle = (t - self.start) / self.period * 2 * math.pi
+        return (self.center[0] + math.cos(angle) * self.radius,
+                self.center[1] + math.sin(angle) * self.radius)
+
+    def _feed(self):
+        interval = 1.0 / self.rate
+        while self._running:
+            now = time.perf_counter()
+            x, y = self.path(now)
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(int(x), int(y)), probe_sent=now))
+            time.sleep(interval)
+
+    def poll(self):
+        """Same contract as ``LiveInput.poll``, with the probe's cursor."""
+        events = []
+        for event in pygame.event.get():
+            sent = getattr(event, "probe_sent", None)
+            if sent is None:
+                events.append(event)
+            else:
+                self.position = event.pos
+                self._consumed.append(sent)
+        return pygame.time.get_ticks(), self.position, events
+
+    def presented(self, used_x, used_y):
+        """Call right after present with the cursor position the frame used."""
+        now = time.perf_counter()
+        for sent in self._consumed:
+            self.latencies[self.latency_count % len(self.latencies)] = now - sent
+            self.latency_count += 1
+        self._consumed.clear()
+        true_x, true_y = self.path(now)
+        self.errors[self.error_count % len(self.errors)] = math.hypot(used_x - true_x, used_y - true_y)
+        self.error_count += 1
+
+    def report(self):
+        lines = []
+        for label, values, count, scale, unit in (
+                ("input-to-present", self.latencies, self.latency_count, 1e3, "ms"),
+                ("cursor error at present", self.errors, self.error_count, 1.0, "px")):
+            ordered = sorted(v * scale for v in values[:min(count, len(values))])
+            lines.append(f"{label:>24}: " + "  ".join(
+                f"p{p} {percentile(ordered, p):7.2f} {unit}" for p in PERCENTILES)
+                + f"  ({count} samples)")
+        return "\n".join(lines)
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
@@ -0,0 +1,232 @@
+"""
+Skeleton Pose Stage
+Computes a lizard's full skeleton geometry once per frame, after update,
+into preallocated arrays. Drawing and the offline renderer read the pose
+instead of redoing trig on the raw spine positions
+"""
+import math
+from array import array
+
+TAIL_SEGMENTS = 5
+TAIL_SEGMENT_LENGTH = 10
+LEG_SEGMENTS = (1, 3, 5)
+EYE_OFFSET = 8
+
+# Detail tiers, finest first: full skeleton, spine and legs, spine polyline, dot
+FULL, BODY, LINE, DOT = range(4)
+
+# Fixed rotations used by the skull, eyes and feet
+_COS_SKULL, _SIN_SKULL = math.cos(2.5), math.sin(2.5)
+_COS_EYE, _SIN_EYE = math.cos(0.4), math.sin(0.4)
+_QUARTER_TURN = math.pi / 4
+
+
+def look_direction(head_x, head_y, look_x, look_y):
+    """Unit vector from the head towards ``(look_x, look_y)``; ``(1, 0)`` if they coincide."""
+    look_dx = look_x - head_x
+    look_dy = look_y - head_y
+    look_length = math.sqrt(look_dx * look_dx + look_dy * look_dy)
+    if look_length > 0:
+        return look_dx / look_length, look_dy / look_length
+    return 1.0, 0.0
+
+
+def place_eyes(eyes, head_x, head_y, cos_a, sin_a):
+    """Write both eye centers of a head looking along ``(cos_a, sin_a)`` into ``eyes``."""
+    eyes[0] = head_x + (cos_a * _COS_EYE - sin_a * _SIN_EYE) * EYE_OFFSET
+    eyes[1] = head_y + (sin_a * _COS_EYE + cos_a * _SIN_EYE) * EYE_OFFSET
+    eyes[2] = head_x + (cos_a * _COS_EYE + sin_a * _SIN_EYE) * EYE_OFFSET
+    eyes[3] = head_y + (sin_a * _COS_EYE - cos_a * _SIN_EYE) * EYE_OFFSET
+
+
+class Pose:
+    """Skeleton geometry for one frame, stored as flat ``x, y`` float arrays.
+
+    - ``spine``: interpolated spine points, ``segments`` pairs
+    - ``directions``: unit vector of each spine segment (towards the tail)
+    - ``tail``: the tail bead centers
+    - ``ribs``: left and right rib end points for each rib in ``rib_segments``
+    - ``legs``: knee then foot point for each leg (left, right per pair)
+    - ``skull``: three skull vertices; ``eyes``: two eye centers; ``jaw``: jaw tip
+    """
+
+    # Buffers in layout order, as used by ``buffer_size`` and shared buffers
+    BUFFERS = ("spine", "directions", "tail", "ribs", "legs", "skull", "eyes", "jaw")
+
+    def __init__(self, spine_segments, buffer=None):
+        self.segments = spine_segments
+        self.rib_segments = tuple(range(2, spine_segments - 1, 2))
+        self.leg_segments = tuple(i for i in LEG_SEGMENTS if i < spine_segments - 1)
+
+        # With ``buffer`` (any writable bytes-like object of at least
+        # ``buffer_size`` doubles, e.g. shared memory) every array is a view
+        # into it; otherwise each gets its own array
+        offset = 0
+        view = None if buffer is None else memoryview(buffer).cast('B')
+        for name, length in zip(self.BUFFERS, self._lengths(spine_segments)):
+            if view is None:
+                setattr(self, name, array('d', bytes(8 * length)))
+            else:
+                setattr(self, name, view[8 * offset:8 * (offset + length)].cast('d'))
+            offset += length
+
+        self.head_x = self.head_y = 0.0
+        # Unit vector the head is looking along
+        self.look_x, self.look_y = 1.0, 0.0
+        self.color = (0, 0, 0)
+        self.hue = 0.0
+
+    @staticmethod
+    def _lengths(spine_segments):
+        rib_count = len(range(2, spine_segments - 1, 2))
+        leg_count = sum(1 for i in LEG_SEGMENTS if i < spine_segments - 1)
+        return (2 * spine_segments, 2 * max(spine_segments - 1, 0), 2 * TAIL_SEGMENTS,
+                4 * rib_count, 8 * leg_count, 6, 4, 2)
+
+    @classmethod
+    def buffer_size(cls, spine_segments):
+        """Number of doubles a pose of ``spine_segments`` needs in a shared buffer."""
+        return sum(cls._lengths(spine_segments))
+
+    def compute(self, lizard, alpha, look_x, look_y, detail=FULL):
+        """Fill the pose from ``lizard`` blended by ``alpha`` towards its current step.
+
+        Below ``FULL`` detail only the parts that tier draws are computed:
+        spine and tail always, legs for ``BODY``. The rest keep their values
+        from the last pose that computed them.
+        """
+        spine = self.spine
+        segments = self.segments
+        prev_positions = lizard.prev_spine_positions
+        positions = lizard.spine_positions
+        for i in range(segments):
+            prev = prev_positions[i]
+            pos = positions[i]
+            spine[2 * i] = prev[0] + (pos[0] - prev[0]) * alpha
+            spine[2 * i + 1] = prev[1] + (pos[1] - prev[1]) * alpha
+
+        # Segment direction unit vectors, (1, 0) for collapsed segments
+        directions = self.directions
+        for i in range(segments - 1):
+            dx = spine[2 * i + 2] - spine[2 * i]
+            dy = spine[2 * i + 3] - spine[2 * i + 1]
+            length = math.sqrt(dx * dx + dy * dy)
+            if length > 0:
+                directions[2 * i] = dx / length
+                directions[2 * i + 1] = dy / length
+            else:
+                directions[2 * i] = 1.0
+                directions[2 * i + 1] = 0.0
+
+        time = (lizard.prev_time + (lizard.time - lizard.prev_time) * alpha) * 5
+        head_x = self.head_x = spine[0]
+        head_y = self.head_y = spine[1]
+        self.hue = lizard.hue
+        self.color = lizard.get_color()
+
+        # Tail continues along the last segment with a traveling wave
+        tail = self.tail
+        if segments >= 2:
+            dir_x = directions[2 * (segments - 2)]
+            dir_y = directions[2 * (segments - 2) + 1]
+            prev_x = spine[2 * (segments - 1)]
+            prev_y = spine[2 * (segments - 1) + 1]
+            for i in range(TAIL_SEGMENTS):
+                wave = math.sin(time * 2 - i * 0.5) * 3
+                prev_x = prev_x + dir_x * TAIL_SEGMENT_LENGTH
+                prev_y = prev_y + dir_y * TAIL_SEGMENT_LENGTH + wave
+                tail[2 * i] = prev_x
+                tail[2 * i + 1] = prev_y
+        if detail >= LINE:
+            return self
+
+        # Ribs stick out perpendicular to the spine on both sides
+        if detail == FULL:
+            ribs = self.ribs
+            rib_length = lizard.rib_length
+            for n, i in enumerate(self.rib_segments):
+                x, y = spine[2 * i], spine[2 * i + 1]
+                perp_x = -directions[2 * i + 1] * rib_length
+                perp_y = directions[2 * i] * rib_length
+                ribs[4 * n] = x + perp_x
+                ribs[4 * n + 1] = y + perp_y
+                ribs[4 * n + 2] = x - perp_x
+                ribs[4 * n + 3] = y - perp_y
+
+        # Two-bone legs, swinging only while the lizard moves
+        legs = self.legs
+        leg_length = lizard.leg_length
+        joint_length = lizard.leg_joint_length
+        for n, i in enumerate(self.leg_segments):
+            if lizard.is_moving:
+                if lizard.is_running:
+                    leg_wave = math.sin(time * 6 + n * 2) * 0.6
+                else:
+                    leg_wave = math.sin(time * 3 + n * 2) * 0.4
+            else:
+                leg_wave = 0.0
+            x, y = spine[2 * i], spine[2 * i + 1]
+            dir_x, dir_y = directions[2 * i], directions[2 * i + 1]
+            wave_cos, wave_sin = math.cos(leg_wave), math.sin(leg_wave)
+            foot_angle = _QUARTER_TURN + leg_wave * 0.5
+            foot_cos, foot_sin = math.cos(foot_angle), math.sin(foot_angle)
+            base = 8 * n
+            for side in (1, -1):
+                # Upper bone: spine direction turned a quarter plus the swing
+                perp_x, perp_y = -dir_y * side, dir_x * side
+                leg_x = perp_x * wave_cos - perp_y * wave_sin * side
+                leg_y = perp_y * wave_cos + perp_x * wave_sin * side
+                knee_x = x + leg_x * leg_length
+                knee_y = y + leg_y * leg_length
+                # Lower bone: a further eighth turn plus half the swing
+                foot_x = knee_x + (leg_x * foot_cos - leg_y * foot_sin * side) * joint_length
+                foot_y = knee_y + (leg_y * foot_cos + leg_x * foot_sin * side) * joint_length
+                legs[base] = knee_x
+                legs[base + 1] = knee_y
+                legs[base + 2] = foot_x
+                legs[base + 3] = foot_y
+                base += 4
+        if detail != FULL:
+            return self
+
+        # Skull, eyes and jaw point towards the look target
+        cos_a, sin_a = look_direction(head_x, head_y, look_x, look_y)
+        self.look_x, self.look_y = cos_a, sin_a
+
+        skull = self.skull
+        head_size = lizard.head_size
+        skull_width = lizard.skull_width
+        skull[0] = head_x + cos_a * head_size
+        skull[1] = head_y + sin_a * head_size
+        skull[2] = head_x + (cos_a * _COS_SKULL - sin_a * _SIN_SKULL) * skull_width
+        skull[3] = head_y + (sin_a * _COS_SKULL + cos_a * _SIN_SKULL) * skull_width
+        skull[4] = head_x + (cos_a * _COS_SKULL + sin_a * _SIN_SKULL) * skull_width
+        skull[5] = head_y + (sin_a * _COS_SKULL - cos_a * _SIN_SKULL) * skull_width
+
+        place_eyes(self.eyes, head_x, head_y, cos_a, sin_a)
+
+        jaw_length = head_size * 0.8
+        self.jaw[0] = head_x + cos_a * jaw_length
+        self.jaw[1] = head_y + sin_a * jaw_length
+        return self
+
+    def scaled(self, factor, out=None):
+        """Copy of this pose with every point scaled by ``factor`` about the origin.
+
+        Used to draw into a render target smaller than the window while the
+        simulation stays in window pixels. Fills ``out``'s buffers in place and
+        returns it if given, so drawing allocates nothing per frame.
+        """
+        if out is None:
+            out = Pose(self.segments)
+        for name in ("spine", "tail", "ribs", "legs", "skull", "eyes", "jaw"):
+            source = getattr(self, name)
+            target = getattr(out, name)
+            for i in range(len(source)):
+                target[i] = source[i] * factor
+        out.head_x = self.head_x * factor
+        out.head_y = self.head_y * factor
+        out.look_x, out.look_y = self.look_x, self.look_y
+        out.color = self.color
+        out.hue = self.hue
+        return out
@@ -0,0 +1,329 @@
+"""
+Offline Render Pipeline
+Drives SkeletonLizard along a scripted or recorded target path and renders
+the frames off-screen in a process pool, streaming a PNG sequence, an
+animated GIF or a raw RGB video to disk in frame order
+"""
+import argparse
+import copy
+import io
+import math
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from input_trace import MAGIC, TraceReader
+from sim_clock import SimulationClock
+from skeleton_lizard import BACKGROUND_COLOR, SkeletonLizard
+from sprite_atlas import hue_to_color
+
+FORMATS = ("png", "gif", "raw")
+# GIF delays are whole hundredths of a second and browsers play anything
+# under 20 ms at 100 ms, so GIFs never carry more frames per second than this
+GIF_MAX_FPS = 50
+PATHS = ("circle", "figure8", "random")
+
+
+def scripted_path(name, width, height, frames, seed=0):
+    """Cursor positions for one of the built-in ``PATHS``, one per frame."""
+    cx, cy = width / 2, height / 2
+    radius = min(width, height) * 0.35
+    rng = random.Random(seed)
+    target = (cx, cy)
+    for frame in range(frames):
+        t = frame / 120 * math.pi
+        if name == "circle":
+            target = (cx + math.cos(t) * radius, cy + math.sin(t) * radius)
+        elif name == "figure8":
+            target = (cx + math.sin(t) * radius, cy + math.sin(t * 2) * radius * 0.5)
+        elif name == "random":
+            if frame % 90 == 0:
+                target = (rng.uniform(0, width), rng.uniform(0, height))
+        else:
+            raise ValueError(f"Unknown path: {name}")
+        yield target
+
+
+def load_path(filename):
+    """Recorded cursor path: an input trace, or one ``x,y`` pair per line."""
+    with open(filename, "rb") as f:
+        is_trace = f.read(len(MAGIC)) == MAGIC
+    if is_trace:
+        reader = TraceReader(filename)
+        frames = reader.frames()
+        try:
+            for _, mouse_pos, _ in frames:
+                yield mouse_pos
+        finally:
+            # The frames iterator holds a view of the map; release it first
+            frames.close()
+            reader.close()
+        return
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                x, y = line.split(",")[:2]
+                yield float(x), float(y)
+
+
+def simulate(path, width, height, lizard_count=1, fps=60, seed=0):
+    """Run the simulation along ``path`` and yield each frame's poses.
+
+    Each frame is a list of ``(spine_segments, pose)`` pairs, copied so they
+    can be shipped to a worker process while the simulation moves on.
+    """
+    rng = random.Random(seed)
+    lizards = [SkeletonLizard(width // 2, height // 2)]
+    lizards += [SkeletonLizard(rng.uniform(0, width), rng.uniform(0, height))
+                for _ in range(lizard_count - 1)]
+    clock = SimulationClock()
+    for target_x, target_y in path:
+        for _ in range(clock.advance(1 / fps)):
+            for lizard in lizards:
+                lizard.update(target_x, target_y, clock.dt)
+        frame = []
+        for lizard in lizards:
+            pose = lizard.compute_pose(clock.alpha, target_x, target_y)
+            frame.append((lizard.spine_segments, copy.deepcopy(pose)))
+        yield frame
+
+
+def gif_palette():
+    """Fixed GIF palette: black plus 255 colors around the lizard hue wheel."""
+    palette = [0, 0, 0]
+    for i in range(255):
+        palette.extend(hue_to_color(i * 360 / 255))
+    return palette
+
+
+# Worker process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(width, height):
+    pygame.init()
+    _worker["surface"] = pygame.Surface((width, height))
+    _worker["shells"] = {}
+    _worker["palette"] = None
+
+
+def _render_frame(frame):
+    surface = _worker["surface"]
+    shells = _worker["shells"]
+    surface.fill(BACKGROUND_COLOR)
+    joints = []
+    for segments, pose in frame:
+        # A bare lizard of the right length to draw the shipped pose
+        shell = shells.get(segments)
+        if shell is None:
+            shell = shells[segments] = SkeletonLizard(0, 0, segments)
+        shell.pose = pose
+        shell.draw(surface, joints)
+    surface.blits(joints, doreturn=False)
+    return surface
+
+
+def gif_timing(frames, fps):
+    """Thin ``frames`` to at most ``GIF_MAX_FPS`` and pair each with its GIF delay.
+
+    Output frame ``n`` shows the latest simulated frame at ``n / rate``
+    seconds and lasts until the next one, measured between the two times
+    rounded to centiseconds, so the rounding never accumulates over a clip.
+    """
+    rate = min(fps, GIF_MAX_FPS)
+    shown = 0
+    for index, frame in enumerate(frames):
+        if index == shown * fps // rate:
+            delay = round(100 * (shown + 1) / rate) - round(100 * shown / rate)
+            shown += 1
+            yield frame, delay * 10
+
+
+def _encode_gif(surface, duration):
+    from PIL import GifImagePlugin, Image
+
+    palette = _worker.get("palette")
+    if palette is None:
+        palette = _worker["palette"] = Image.new("P", (1, 1))
+        palette.putpalette(gif_palette())
+    image = Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+    image = image.quantize(palette=palette, dither=Image.Dither.NONE)
+    return b"".join(GifImagePlugin.getdata(image, duration=duration))
+
+
+def _render_chunk(fmt, frames):
+    """Rasterize and encode a run of ``(frame, duration_ms)``; returns one bytes object per frame."""
+    encoded = []
+    for frame, duration in frames:
+        surface = _render_frame(frame)
+        if fmt == "png":
+            buffer = io.BytesIO()
+            pygame.image.save(surface, buffer, "frame.png")
+            encoded.append(buffer.getvalue())
+        elif fmt == "gif":
+            encoded.append(_encode_gif(surface, duration))
+        else:
+            encoded.append(pygame.image.tobytes(surface, "RGB"))
+    return encoded
+
+
+class PngSequenceWriter:
+    """Writes ``frame_00000.png``, ``frame_00001.png``, ... into a directory."""
+
+    def __init__(self, directory, width, height, fps):
+        self.directory = directory
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, data):
+        with open(os.path.join(self.directory, f"frame_{self.count:05d}.png"), "wb") as f:
+            f.write(data)
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class RawVideoWriter:
+    """Concatenated rgb24 frames, e.g. for ``ffmpeg -f rawvideo -pix_fmt rgb24``."""
+
+    def __init__(self, filename, width, height, fps):
+        self.file = sys.stdout.buffer if filename == "-" else open(filename, "wb")
+        self.count = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.count += 1
+
+    def close(self):
+        if self.file is not sys.stdout.buffer:
+            self.file.close()
+
+
+class GifWriter:
+    """Looping animated GIF written frame by frame with a fixed global palette."""
+
+    def __init__(self, filename, width, height, fps):
+        from PIL import GifImagePlugin, Image
+
+        self.file = open(filename, "wb")
+        self.count = 0
+        image = Image.new("P", (width, height))
+        image.putpalette(gif_palette())
+        header, _ = GifImagePlugin.getheader(image, info={"loop": 0, "optimize": False})
+        for chunk in header:
+            self.file.write(chunk)
+
+    def write(self, data):
+        self.file.write(data)
+        self.count += 1
+
+    def close(self):
+        self.file.write(b";")  # GIF trailer
+        self.file.close()
+
+
+WRITERS = {"png": PngSequenceWriter, "gif": GifWriter, "raw": RawVideoWriter}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def render(path, output, fmt, width, height, fps=60, lizard_count=1,
+           workers=None, chunk_size=8, max_pending=None):
+    """Render every frame of ``path`` to ``output``; returns the frame count.
+
+    The simulation always steps at ``fps``; GIF output keeps at most
+    ``GIF_MAX_FPS`` of those frames per second.
+
+    At most ``max_pending`` chunks are in flight, so memory stays bounded
+    however long the render is, and chunks are written in submission order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    writer = WRITERS[fmt](output, width, height, fps)
+    pending = deque()
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(width, height)) as pool:
+            frames = simulate(path, width, height, lizard_count, fps)
+            if fmt == "gif":
+                frames = gif_timing(frames, fps)
+            else:
+                frames = ((frame, None) for frame in frames)
+            for chunk in chunked(frames, chunk_size):
+                pending.append(pool.submit(_render_chunk, fmt, chunk))
+                if len(pending) >= max_pending:
+                    for data in pending.popleft().result():
+                        writer.write(data)
+            while pending:
+                for data in pending.popleft().result():
+                    writer.write(data)
+    finally:
+        writer.close()
+    return writer.count
+
+
+def guess_format(output):
+    extension = os.path.splitext(output)[1].lower()
+    if extension == ".gif":
+        return "gif"
+    if extension in (".rgb", ".raw") or output == "-":
+        return "raw"
+    return "png"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render the skeleton lizard to files without a window")
+    parser.add_argument("output", help="PNG directory, .gif file, or .rgb file ('-' for stdout)")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="output format (guessed from the output name by default)")
+    parser.add_argument("--path", choices=PATHS, default="circle", help="scripted cursor path")
+    parser.add_argument("--path-file", default=None, help="recorded cursor path: input trace or one x,y per line")
+    parser.add_argument("--frames", type=int, default=600, help="frames for a scripted path")
+    parser.add_argument("--size", default="1024x768", help="frame size, e.g. 1920x1080")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="simulation and output frame rate (GIF output at most 50)")
+    parser.add_argument("--lizards", type=int, default=1, help="number of lizards")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=8, help="frames per worker task")
+    args = parser.parse_args(argv)
+    if args.fps < 1:
+        parser.error("--fps must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    fmt = args.format or guess_format(args.output)
+    if args.path_file:
+        path = load_path(args.path_file)
+    else:
+        path = scripted_path(args.path, width, height, args.frames)
+    count = render(path, args.output, fmt, width, height, args.fps, args.lizards,
+                   args.workers, args.chunk_size)
+    if args.output != "-":
+        fps = min(args.fps, GIF_MAX_FPS) if fmt == "gif" else args.fps
+        print(f"Rendered {count} frames to {args.output} ({fmt}, {width}x{height} @ {fps} fps)")
+
+
+if __name__ == "__main__":
+    main()
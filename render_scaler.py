@@ -0,0 +1,76 @@
+"""
+Dynamic Render Resolution
+Draws the scene into an internal render target that is a fraction of the
+window size and upscales it on present, adjusting the fraction from measured
+frame times so the loop holds its frame budget on large displays
+"""
+import pygame
+
+from frame_budget import OVER, UNDER, FrameBudget
+
+
+class RenderScaler:
+    """Internal render target plus a frame-time controller for its scale.
+
+    ``scale`` is the render target size as a fraction of the window, between
+    ``min_scale`` and ``max_scale`` in steps of ``step``. A ``FrameBudget``
+    watches the frame work time (everything but the wait for the next frame):
+    the scale drops one step after ``patience`` frames over ``high_water`` of
+    the budget and only climbs back after ``4 * patience`` frames under
+    ``low_water``, so it does not oscillate between two neighbouring steps.
+    """
+
+    def __init__(self, target_fps=60, min_scale=0.5, max_scale=1.0, step=0.125,
+                 smooth=False, patience=30, high_water=0.95, low_water=0.6):
+        self.budget = FrameBudget(target_fps, patience, high_water, low_water)
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.step = step
+        self.scale = max_scale
+        self.smooth = smooth
+        self.changes = 0
+        self.target = None
+
+    @property
+    def scaled(self):
+        """True while rendering to an internal target smaller than the window."""
+        return self.scale < 1.0
+
+    def render_size(self, screen):
+        """Size of the render target for ``screen`` at the current scale."""
+        width, height = screen.get_size()
+        return max(int(width * self.scale), 1), max(int(height * self.scale), 1)
+
+    def canvas(self, screen):
+        """Surface to draw this frame on: the screen, or the internal target."""
+        if not self.scaled:
+            return screen
+        size = self.render_size(screen)
+        if self.target is None or self.target.get_size() != size:
+            self.target = pygame.Surface(size, 0, screen)
+        return self.target
+
+    def present(self, screen):
+        """Upscale the internal target over the whole screen."""
+        if self.smooth:
+            pygame.transform.smoothscale(self.target, screen.get_size(), screen)
+        else:
+            pygame.transform.scale(self.target, screen.get_size(), screen)
+
+    def update(self, work_time):
+        """Feed one frame's work time in seconds; returns the scale ratio if it changed."""
+        signal = self.budget.update(work_time)
+        new_scale = self.scale
+        if signal == OVER:
+            new_scale = max(self.scale - self.step, self.min_scale)
+        elif signal == UNDER:
+            new_scale = min(self.scale + self.step, self.max_scale)
+        if new_scale == self.scale:
+            return None
+
+        ratio = new_scale / self.scale
+        self.scale = new_scale
+        self.changes += 1
+        # Start measuring the new scale from scratch
+        self.budget.reset()
+        return ratio
@@ -0,0 +1,125 @@
+"""
+Long-Chain Serpent Mode
+A skeleton creature with thousands of spine segments. The chain is solved
+in NumPy array passes by LizardSwarm's Jacobi solver and drawn as a single
+polyline, so cost per frame stays a few milliseconds up to 10,000 segments
+"""
+import numpy as np
+import pygame
+
+from lizard_swarm import LizardSwarm
+from pose import TAIL_SEGMENTS, look_direction, place_eyes
+from sim_clock import SIM_DT
+from sprite_atlas import default_atlas, hue_to_color
+
+
+class SerpentPose:
+    """Per-frame geometry of a serpent: interpolated spine and head.
+
+    ``spine`` is an ``(segments, 2)`` array; ``tail`` holds the last few
+    spine nodes as flat ``x, y`` pairs so crowd code can treat it like a
+    lizard's tail.
+    """
+
+    def __init__(self, spine_segments):
+        self.segments = spine_segments
+        self.spine = np.zeros((spine_segments, 2))
+        self.tail = [0.0] * (2 * TAIL_SEGMENTS)
+        self.eyes = [0.0] * 4
+        self.color = (0, 0, 0)
+        self.hue = 0.0
+
+    def compute(self, serpent, alpha, look_x, look_y):
+        np.subtract(serpent.swarm.spines[0], serpent.prev_spine, out=self.spine)
+        self.spine *= alpha
+        self.spine += serpent.prev_spine
+        self.hue = serpent.hue
+        self.color = hue_to_color(self.hue)
+
+        self.tail[:] = self.spine[-TAIL_SEGMENTS:].ravel().tolist()
+
+        head_x, head_y = self.spine[0]
+        place_eyes(self.eyes, head_x, head_y, *look_direction(head_x, head_y, look_x, look_y))
+        return self
+
+
+class Serpent:
+    """A single very long creature with the same interface as SkeletonLizard.
+
+    The chain starts laid out straight behind the head at the rest length.
+    ``solver`` picks LizardSwarm's constraint solver; "jacobi" is the fast
+    one for long chains, "sequential" reproduces SkeletonLizard exactly.
+    """
+
+    def __init__(self, x, y, spine_segments=2000, solver="jacobi"):
+        self.swarm = LizardSwarm([(x, y)], spine_segments, solver=solver)
+        self.spine_segments = spine_segments
+        self.swarm.spines[0, :, 0] -= np.arange(spine_segments) * self.swarm.segment_length
+        self.prev_spine = self.swarm.spines[0].copy()
+        self.pose = SerpentPose(spine_segments)
+        self.target_x = x
+        self.target_y = y
+
+    # Scalar views of the one-lizard swarm, for the HUD, pacer and digest
+    @property
+    def spine_positions(self):
+        return self.swarm.spines[0]
+
+    @property
+    def hue(self):
+        return float(self.swarm.hue[0])
+
+    @property
+    def is_moving(self):
+        return bool(self.swarm.is_moving[0])
+
+    @property
+    def is_running(self):
+        return bool(self.swarm.is_running[0])
+
+    @property
+    def current_speed(self):
+        return float(self.swarm.current_speed[0])
+
+    def update(self, target_x, target_y, dt=SIM_DT):
+        self.prev_spine[:] = self.swarm.spines[0]
+        self.target_x = target_x
+        self.target_y = target_y
+        self.swarm.update((target_x, target_y), dt)
+
+    def get_color(self):
+        return hue_to_color(self.hue)
+
+    def compute_pose(self, alpha=1.0, look_x=None, look_y=None):
+        if look_x is None:
+            look_x, look_y = self.target_x, self.target_y
+        return self.pose.compute(self, alpha, look_x, look_y)
+
+    def draw(self, surface, batch=None, atlas=None, scale=1.0):
+        """Draw the body as one polyline plus head and eyes; returns the Rect touched.
+
+        ``scale`` shrinks the drawing for a render target smaller than the window.
+        """
+        pose = self.pose
+        atlas = atlas or default_atlas
+        hue_key = atlas.hue_key(pose.hue)
+        px = int if scale == 1.0 else (lambda size: max(1, round(size * scale)))
+        spine = pose.spine if scale == 1.0 else pose.spine * scale
+        touched = pygame.draw.lines(surface, pose.color, False, spine.astype(np.int32).tolist(), px(4))
+
+        head_x, head_y = int(spine[0, 0]), int(spine[0, 1])
+        head, head_offset = atlas.get(px(8), hue_key)
+        socket, socket_offset = atlas.get(px(6), hue_key, px(2))
+        pupil, pupil_offset = atlas.get(px(3), None)
+        joints = [(head, (head_x - head_offset, head_y - head_offset))]
+        for i in (0, 2):
+            eye_x, eye_y = int(pose.eyes[i] * scale), int(pose.eyes[i + 1] * scale)
+            joints.append((socket, (eye_x - socket_offset, eye_y - socket_offset)))
+            joints.append((pupil, (eye_x - pupil_offset, eye_y - pupil_offset)))
+
+        rects = [sprite.get_rect(topleft=pos) for sprite, pos in joints]
+        if batch is None:
+            surface.blits(joints, doreturn=False)
+        else:
+            batch.extend(joints)
+        return touched.unionall(rects)
@@ -0,0 +1,221 @@
+"""
+Simulation Worker Process
+Runs the SkeletonLizard simulation and pose stage in a separate process.
+Cursor targets go in through a double-buffered shared memory block and
+finished poses come back through a triple-buffered one, so the render loop
+never waits on the simulation, never sees a half-written pose and nothing
+is pickled or copied per frame
+"""
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+from pose import Pose
+from sim_clock import SimulationClock
+from skeleton_lizard import SEPARATION_RADIUS, SkeletonLizard, separate_lizards
+
+# Target block, in doubles: published sequence, two (x, y) slots, stop flag
+_TARGET_SEQ, _TARGET_SLOTS, _TARGET_STOP = 0, 1, 5
+_TARGET_SIZE = 6
+
+# Pose block header, in doubles: published sequence, simulation steps run,
+# latest published slot, slot the renderer has claimed
+_POSE_SEQ, _POSE_STEPS, _POSE_LATEST, _POSE_CLAIMED = 0, 1, 2, 3
+_POSE_HEADER = 4
+# The worker always has a slot that is neither the latest nor claimed
+_POSE_SLOTS = 3
+
+# Per-slot values before the poses: hovered lizard; per lizard: hue,
+# moving flag, running flag, current speed
+_SLOT_HOVERED = 0
+_LIZARD_STATE = 4
+
+
+def _slot_size(lizard_count, spine_segments):
+    return 1 + lizard_count * (_LIZARD_STATE + Pose.buffer_size(spine_segments))
+
+
+class _PoseSlots:
+    """Views of every slot of a pose block, shared by the worker and the renderer.
+
+    Slot ``n`` holds a ``states`` array and one ``Pose`` per lizard, all
+    views into the shared memory; nothing is copied when a slot is read.
+    """
+
+    def __init__(self, buffer, lizard_count, spine_segments):
+        buffer = buffer.cast('B')
+        self.views = []
+        self.header = self._view(buffer, 0, _POSE_HEADER)
+        self.states = []
+        self.poses = []
+        pose_size = Pose.buffer_size(spine_segments)
+        slot_size = _slot_size(lizard_count, spine_segments)
+        for slot in range(_POSE_SLOTS):
+            offset = _POSE_HEADER + slot * slot_size
+            self.states.append(self._view(buffer, offset, 1 + lizard_count * _LIZARD_STATE))
+            offset += 1 + lizard_count * _LIZARD_STATE
+            poses = []
+            for n in range(lizard_count):
+                start = 8 * (offset + n * pose_size)
+                poses.append(Pose(spine_segments, buffer[start:start + 8 * pose_size]))
+            self.poses.append(poses)
+
+    def _view(self, buffer, offset, length):
+        view = buffer[8 * offset:8 * (offset + length)].cast('d')
+        self.views.append(view)
+        return view
+
+    def release(self):
+        """Release every view so the shared memory can be closed."""
+        for view in self.views:
+            view.release()
+        for poses in self.poses:
+            for pose in poses:
+                for name in Pose.BUFFERS:
+                    getattr(pose, name).release()
+        self.views = self.states = self.poses = self.header = None
+
+
+def _simulate(target_name, pose_name, positions, spine_segments, time_scale, still_at_rest):
+    """Worker process main loop: step in real time, publish a pose slot per step batch."""
+    target_memory = shared_memory.SharedMemory(target_name)
+    pose_memory = shared_memory.SharedMemory(pose_name)
+    targets = target_memory.buf.cast('d')
+    slots = _PoseSlots(pose_memory.buf, len(positions), spine_segments)
+    header = slots.header
+
+    lizards = [SkeletonLizard(x, y, spine_segments) for x, y in positions]
+    for lizard in lizards:
+        lizard.still_at_rest = still_at_rest
+    clock = SimulationClock(time_scale=time_scale)
+    grid = None
+    last = time.perf_counter()
+    try:
+        while targets[_TARGET_STOP] == 0:
+            # Latest cursor target; the main process only writes the other slot
+            base = _TARGET_SLOTS + 2 * (int(targets[_TARGET_SEQ]) % 2)
+            target_x, target_y = targets[base], targets[base + 1]
+
+            now = time.perf_counter()
+            steps = clock.advance(now - last)
+            last = now
+            if steps == 0:
+                time.sleep((clock.dt - clock.accumulator) / clock.time_scale)
+                continue
+            for _ in range(steps):
+                for lizard in lizards:
+                    lizard.update(target_x, target_y, clock.dt)
+                if len(lizards) > 1:
+                    grid = separate_lizards(lizards, grid)
+
+            # Fill a slot that is neither the latest one nor claimed by the
+            # renderer, then publish it
+            published = int(header[_POSE_SEQ])
+            latest, claimed = int(header[_POSE_LATEST]), int(header[_POSE_CLAIMED])
+            slot = next(n for n in range(_POSE_SLOTS) if n != latest and n != claimed)
+            states = slots.states[slot]
+            states[_SLOT_HOVERED] = grid.owner_at(target_x, target_y, SEPARATION_RADIUS) if grid else -1
+            for n, (lizard, pose) in enumerate(zip(lizards, slots.poses[slot])):
+                lizard.pose = pose
+                lizard.compute_pose(1.0, target_x, target_y)
+                base = 1 + n * _LIZARD_STATE
+                states[base] = lizard.hue
+                states[base + 1] = lizard.is_moving
+                states[base + 2] = lizard.is_running
+                states[base + 3] = lizard.current_speed
+            header[_POSE_STEPS] = clock.steps
+            header[_POSE_LATEST] = slot
+            header[_POSE_SEQ] = published + 1
+    finally:
+        slots.release()
+        targets.release()
+        target_memory.close()
+        pose_memory.close()
+
+
+class SimulationProcess:
+    """Owner of the worker process and its shared memory, on the render side.
+
+    ``lizards`` are drawing shells: each frame ``sync`` claims the latest
+    published slot and points them at its poses and movement state; the
+    worker never writes a claimed slot. Call ``send_target`` with the cursor
+    position every frame and ``close`` when done.
+    """
+
+    def __init__(self, positions, spine_segments=8, time_scale=1.0, still_at_rest=False):
+        self.spine_segments = spine_segments
+        count = len(positions)
+        self.target_memory = shared_memory.SharedMemory(create=True, size=8 * _TARGET_SIZE)
+        self.pose_memory = shared_memory.SharedMemory(
+            create=True, size=8 * (_POSE_HEADER + _POSE_SLOTS * _slot_size(count, spine_segments)))
+        self.targets = self.target_memory.buf.cast('d')
+        self.slots = _PoseSlots(self.pose_memory.buf, count, spine_segments)
+        for i in range(_TARGET_SIZE):
+            self.targets[i] = 0.0
+        for i in range(_POSE_HEADER):
+            self.slots.header[i] = 0.0
+        self.send_target(*positions[0])
+
+        self.lizards = [SkeletonLizard(x, y, spine_segments) for x, y in positions]
+        for lizard in self.lizards:
+            lizard.compute_pose()  # Drawn until the first pose is published
+        # Frames drawn with a pose already drawn the frame before
+        self.repeated_frames = 0
+        self.frame_seq = 0
+        self.steps = 0
+
+        self.process = multiprocessing.Process(
+            target=_simulate, daemon=True,
+            args=(self.target_memory.name, self.pose_memory.name, [tuple(p) for p in positions],
+                  spine_segments, time_scale, still_at_rest))
+        self.process.start()
+
+    def send_target(self, x, y):
+        """Publish the cursor target for the next simulation steps."""
+        targets = self.targets
+        published = int(targets[_TARGET_SEQ])
+        base = _TARGET_SLOTS + 2 * ((published + 1) % 2)
+        targets[base] = x
+        targets[base + 1] = y
+        targets[_TARGET_SEQ] = published + 1
+
+    def sync(self):
+        """Point the shells at the latest published poses; returns the hovered lizard."""
+        header = self.slots.header
+        seq = int(header[_POSE_SEQ])
+        if seq == 0:
+            return -1  # Nothing simulated yet; keep the initial pose
+        if seq == self.frame_seq:
+            self.repeated_frames += 1
+        self.frame_seq = seq
+        # Claim the latest slot; if a newer one was published meanwhile the
+        # worker may already be refilling the one claimed, so claim again
+        while True:
+            slot = int(header[_POSE_LATEST])
+            header[_POSE_CLAIMED] = slot
+            if int(header[_POSE_LATEST]) == slot:
+                break
+        states = self.slots.states[slot]
+        for n, (lizard, pose) in enumerate(zip(self.lizards, self.slots.poses[slot])):
+            base = 1 + n * _LIZARD_STATE
+            lizard.pose = pose
+            lizard.hue = pose.hue = states[base]
+            lizard.is_moving = states[base + 1] != 0
+            lizard.is_running = states[base + 2] != 0
+            lizard.current_speed = states[base + 3]
+            pose.color = lizard.get_color()
+        return int(states[_SLOT_HOVERED])
+
+    def close(self):
+        """Stop the worker and free the shared memory; sets the final ``steps`` count."""
+        self.targets[_TARGET_STOP] = 1.0
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.steps = int(self.slots.header[_POSE_STEPS])
+        self.slots.release()
+        self.targets.release()
+        self.target_memory.close()
+        self.target_memory.unlink()
+        self.pose_memory.close()
+        self.pose_memory.unlink()
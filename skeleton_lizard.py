@@ -0,0 +1,428 @@
+"""
+Skeleton Lizard Core
+Importable simulation and drawing code for the skeleton lizard follower
+Nothing here opens a window, so it can be timed or run headless
+"""
+import os
+import pygame
+import math
+import colorsys
+
+from sim_clock import SIM_DT, SIM_RATE
+from pose import BODY, DOT, FULL, TAIL_SEGMENTS, Pose
+from sprite_atlas import default_atlas
+
+# Default window size
+WINDOW_WIDTH, WINDOW_HEIGHT = 1024, 768
+BACKGROUND_COLOR = (0, 0, 0)
+
+# Lizard-to-lizard separation distance and stiffness
+SEPARATION_RADIUS = 20
+SEPARATION_STRENGTH = 0.5
+
+
+def init_pygame(headless=False, fast=False):
+    """Initialize pygame, using SDL's dummy video driver when headless.
+
+    ``fast`` starts only the display; audio, joystick and the other
+    subsystems are never started and fonts are loaded by the first HUD draw.
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if fast:
+        pygame.display.init()
+    else:
+        pygame.init()
+
+
+# Skeleton Lizard properties
+class SkeletonLizard:
+    def __init__(self, x, y, spine_segments=8):
+        self.x = x
+        self.y = y
+        self.target_x = x
+        self.target_y = y
+        
+        # Movement properties with acceleration
+        self.current_speed = 0
+        self.min_speed = 0.5
+        self.walk_speed = 3
+        self.run_speed = 8
+        self.acceleration = 0.3
+        self.deceleration = 0.5
+        
+        # Distance thresholds (in pixels, roughly 10cm = 380 pixels at 96 DPI)
+        self.run_distance = 380  # Start running when far away
+        self.walk_distance = 100  # Walk when closer
+        self.stop_distance = 10   # Stop when very close
+        
+        # Skeleton proportions (longer lizard)
+        self.spine_segments = spine_segments
+        self.segment_length = 20
+        self.min_segment_length = 15  # Minimum to prevent overlap
+        self.max_segment_length = 25  # Maximum stretch
+        self.head_size = 25
+        self.skull_width = 20
+        self.leg_pairs = 3
+        self.leg_length = 40
+        self.leg_joint_length = 25
+        self.rib_length = 15
+        
+        # Spine position history for smooth body movement
+        self.spine_positions = [[x, y] for _ in range(self.spine_segments)]
+        # Pose from the previous simulation step, used to interpolate rendering
+        self.prev_spine_positions = [[x, y] for _ in range(self.spine_segments)]
+        # Skeleton geometry for rendering, filled by compute_pose
+        self.pose = Pose(self.spine_segments)
+        # Detail tier to draw at, set each frame by a lod.LodController
+        self.lod = FULL
+        # Scaled copy of the pose for drawing below window resolution
+        self.render_pose = None
+        
+        # Simulation time in seconds, drives the tail and leg animation
+        self.time = 0.0
+        self.prev_time = 0.0
+        # Hold the animation while at rest, so an idle scene is fully still
+        # (set for adaptive pacing; by default the tail keeps waving)
+        self.still_at_rest = False
+        
+        self.hue = 0
+        
+        # Movement tracking
+        self.is_moving = False
+        self.is_running = False
+        self.velocity = 0
+        self.last_position = [x, y]
+        self.movement_threshold = 0.3
+        
+    def update(self, target_x, target_y, dt=SIM_DT):
+        # Movement constants are per 1/SIM_RATE step; scale them to dt
+        step = dt * SIM_RATE
+        
+        # Keep the previous pose for interpolated rendering
+        for prev, pos in zip(self.prev_spine_positions, self.spine_positions):
+            prev[0] = pos[0]
+            prev[1] = pos[1]
+        self.prev_time = self.time
+        self.target_x = target_x
+        self.target_y = target_y
+        
+        # Calculate distance to target
+        dx = target_x - self.spine_positions[0][0]
+        dy = target_y - self.spine_positions[0][1]
+        dist_to_target = math.sqrt(dx**2 + dy**2)
+        
+        # Determine target speed based on distance
+        if dist_to_target > self.run_distance:
+            # Far away - run
+            target_speed = self.run_speed
+            self.is_running = True
+        elif dist_to_target > self.walk_distance:
+            # Medium distance - walk
+            target_speed = self.walk_speed
+            self.is_running = False
+        elif dist_to_target > self.stop_distance:
+            # Close - slow walk
+            target_speed = self.min_speed + (self.walk_speed - self.min_speed) * (dist_to_target / self.walk_distance)
+            self.is_running = False
+        else:
+            # Very close - stop
+            target_speed = 0
+            self.is_running = False
+        
+        # Smooth acceleration/deceleration
+        if self.current_speed < target_speed:
+            self.current_speed += self.acceleration * step
+            if self.current_speed > target_speed:
+                self.current_speed = target_speed
+        elif self.current_speed > target_speed:
+            self.current_speed -= self.deceleration * step
+            if self.current_speed < target_speed:
+                self.current_speed = target_speed
+        
+        # Track movement for animation
+        head_movement = math.sqrt(
+            (self.spine_positions[0][0] - self.last_position[0])**2 +
+            (self.spine_positions[0][1] - self.last_position[1])**2
+        )
+        
+        # Update movement state
+        if head_movement > self.movement_threshold * step:
+            self.is_moving = True
+            self.velocity = head_movement / step
+        else:
+            self.is_moving = False
+            self.velocity = 0
+        if not self.still_at_rest or self.is_moving or self.current_speed > 0:
+            self.time += dt
+        
+        # Store current position for next frame
+        self.last_position = [self.spine_positions[0][0], self.spine_positions[0][1]]
+        
+        # Move head towards target with current speed
+        if dist_to_target > self.stop_distance:
+            move_x = (dx / dist_to_target) * self.current_speed * step
+            move_y = (dy / dist_to_target) * self.current_speed * step
+            self.spine_positions[0][0] += move_x
+            self.spine_positions[0][1] += move_y
+        
+        # Update spine segments with proper spacing to prevent overlap
+        for i in range(1, self.spine_segments):
+            dx = self.spine_positions[i-1][0] - self.spine_positions[i][0]
+            dy = self.spine_positions[i-1][1] - self.spine_positions[i][1]
+            current_dist = math.sqrt(dx**2 + dy**2)
+            
+            # Enforce minimum distance to prevent overlap
+            if current_dist < self.min_segment_length:
+                # Push segment away to maintain minimum distance
+                if current_dist > 0:
+                    ratio = (self.min_segment_length - current_dist) / current_dist
+                    self.spine_positions[i][0] -= dx * ratio * 0.5
+                    self.spine_positions[i][1] -= dy * ratio * 0.5
+            elif current_dist > self.max_segment_length:
+                # Pull segment closer if too far
+                ratio = (current_dist - self.segment_length) / current_dist
+                self.spine_positions[i][0] += dx * ratio * 0.6
+                self.spine_positions[i][1] += dy * ratio * 0.6
+            elif current_dist > self.segment_length:
+                # Normal following behavior
+                ratio = (current_dist - self.segment_length) / current_dist
+                self.spine_positions[i][0] += dx * ratio * 0.5
+                self.spine_positions[i][1] += dy * ratio * 0.5
+        
+        # Update head position
+        self.x = self.spine_positions[0][0]
+        self.y = self.spine_positions[0][1]
+        
+        # Update color hue - faster when running
+        if self.is_moving:
+            if self.is_running:
+                self.hue = (self.hue + 0.8 * step) % 360  # Faster color change when running
+            else:
+                self.hue = (self.hue + 0.3 * step) % 360
+        
+    def get_color(self):
+        rgb = colorsys.hsv_to_rgb(self.hue / 360, 0.9, 1.0)
+        return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
+    
+    def compute_pose(self, alpha=1.0, look_x=None, look_y=None):
+        """Pose stage: compute this frame's skeleton geometry after update.
+
+        ``alpha`` blends between the previous and current simulation step and
+        the head looks at ``(look_x, look_y)``, the last target by default.
+        Only the parts drawn at the current ``lod`` tier are computed.
+        """
+        if look_x is None:
+            look_x, look_y = self.target_x, self.target_y
+        return self.pose.compute(self, alpha, look_x, look_y, self.lod)
+    
+    def _render_pose(self, scale):
+        """The pose to draw: as computed, or scaled into a smaller render target."""
+        if scale == 1.0:
+            return self.pose
+        if self.render_pose is None:
+            self.render_pose = Pose(self.spine_segments)
+        return self.pose.scaled(scale, self.render_pose)
+
+    def draw(self, surface, batch=None, atlas=None, scale=1.0):
+        """Draw the current pose and return the bounding Rect of the pixels touched.
+
+        Bones are drawn immediately; joints are pre-rendered sprites from
+        ``atlas`` blitted in one batch. Pass a shared ``batch`` list to defer
+        the joints so several lizards can be blitted with a single call.
+        ``scale`` shrinks the whole skeleton, line widths and joints included,
+        for a render target smaller than the window.
+        Below the ``FULL`` detail tier ``draw_simplified`` is used instead.
+        """
+        if self.lod != FULL:
+            return self.draw_simplified(surface, batch, atlas, scale)
+        pose = self._render_pose(scale)
+        color = pose.color
+        spine = pose.spine
+        line = pygame.draw.line
+        px = _pixel_sizer(scale)
+        # Bounding rects of everything drawn, for dirty-rect rendering
+        touched = []
+        
+        # Joint sprites for this hue, blitted after the bones
+        atlas = atlas or default_atlas
+        hue_key = atlas.hue_key(pose.hue)
+        joints = []
+        spine_joint, spine_offset = atlas.get(px(6), hue_key)
+        knee_joint, knee_offset = atlas.get(px(5), hue_key)
+        foot_joint, foot_offset = atlas.get(px(4), hue_key)
+        
+        # Draw tail
+        if self.spine_segments >= 2:
+            tail = pose.tail
+            prev_pos = (int(spine[-2]), int(spine[-1]))
+            for i in range(TAIL_SEGMENTS):
+                tail_pos = (int(tail[2 * i]), int(tail[2 * i + 1]))
+                tail_size = px(max(2, 8 - i))
+                touched.append(line(surface, color, prev_pos, tail_pos, px(3)))
+                bead, bead_offset = atlas.get(tail_size, hue_key)
+                joints.append((bead, (tail_pos[0] - bead_offset, tail_pos[1] - bead_offset)))
+                prev_pos = tail_pos
+        
+        # Draw spine
+        spine_points = [(int(spine[2 * i]), int(spine[2 * i + 1])) for i in range(self.spine_segments)]
+        for i in range(len(spine_points) - 1):
+            touched.append(line(surface, color, spine_points[i], spine_points[i + 1], px(4)))
+        for x, y in spine_points:
+            joints.append((spine_joint, (x - spine_offset, y - spine_offset)))
+        
+        # Draw ribs
+        ribs = pose.ribs
+        for n, i in enumerate(pose.rib_segments):
+            touched.append(line(surface, color, spine_points[i],
+                                (int(ribs[4 * n]), int(ribs[4 * n + 1])), px(2)))
+            touched.append(line(surface, color, spine_points[i],
+                                (int(ribs[4 * n + 2]), int(ribs[4 * n + 3])), px(2)))
+        
+        # Draw 6 legs (knee then foot, left then right)
+        legs = pose.legs
+        for n, i in enumerate(pose.leg_segments):
+            for base in (8 * n, 8 * n + 4):
+                knee = (int(legs[base]), int(legs[base + 1]))
+                foot = (int(legs[base + 2]), int(legs[base + 3]))
+                touched.append(line(surface, color, spine_points[i], knee, px(4)))
+                joints.append((knee_joint, (knee[0] - knee_offset, knee[1] - knee_offset)))
+                touched.append(line(surface, color, knee, foot, px(4)))
+                joints.append((foot_joint, (foot[0] - foot_offset, foot[1] - foot_offset)))
+        
+        # Draw skull
+        skull = pose.skull
+        touched.append(pygame.draw.polygon(surface, color, [(skull[0], skull[1]), (skull[2], skull[3]),
+                                                            (skull[4], skull[5])], px(3)))
+        
+        # Eye sockets and pupils
+        eyes = pose.eyes
+        socket, socket_offset = atlas.get(px(6), hue_key, px(2))
+        pupil, pupil_offset = atlas.get(px(3), None)
+        eye1 = (int(eyes[0]), int(eyes[1]))
+        eye2 = (int(eyes[2]), int(eyes[3]))
+        joints.append((socket, (eye1[0] - socket_offset, eye1[1] - socket_offset)))
+        joints.append((socket, (eye2[0] - socket_offset, eye2[1] - socket_offset)))
+        joints.append((pupil, (eye1[0] - pupil_offset, eye1[1] - pupil_offset)))
+        joints.append((pupil, (eye2[0] - pupil_offset, eye2[1] - pupil_offset)))
+        
+        # Jaw line
+        touched.append(line(surface, color, spine_points[0], (int(pose.jaw[0]), int(pose.jaw[1])), px(3)))
+        
+        # Joints: one blit batch, or queue them for the caller's batch
+        for sprite, pos in joints:
+            touched.append(sprite.get_rect(topleft=pos))
+        if batch is None:
+            surface.blits(joints, doreturn=False)
+        else:
+            batch.extend(joints)
+        
+        return touched[0].unionall(touched[1:])
+
+    def draw_simplified(self, surface, batch=None, atlas=None, scale=1.0):
+        """Draw at the ``lod`` tier: spine and legs, a spine polyline, or a dot.
+
+        Same contract as ``draw``; the head sprite (or the dot) goes through
+        the joint batch.
+        """
+        pose = self._render_pose(scale)
+        px = _pixel_sizer(scale)
+        color = pose.color
+        spine = pose.spine
+        atlas = atlas or default_atlas
+        hue_key = atlas.hue_key(pose.hue)
+        head_x, head_y = int(spine[0]), int(spine[1])
+
+        # Spine and tail as one polyline
+        points = [(int(spine[2 * i]), int(spine[2 * i + 1])) for i in range(self.spine_segments)]
+        if self.spine_segments >= 2:
+            tail = pose.tail
+            points += [(int(tail[2 * i]), int(tail[2 * i + 1])) for i in range(TAIL_SEGMENTS)]
+        if self.lod == DOT or len(points) < 2:
+            sprite, offset = atlas.get(px(4), hue_key)
+            touched = []
+        else:
+            touched = [pygame.draw.lines(surface, color, False, points, px(3 if self.lod == BODY else 2))]
+            sprite, offset = atlas.get(px(6), hue_key)
+
+        if self.lod == BODY:
+            # Legs as plain two-bone lines, without knee and foot joints
+            line = pygame.draw.line
+            legs = pose.legs
+            for n, i in enumerate(pose.leg_segments):
+                for base in (8 * n, 8 * n + 4):
+                    knee = (int(legs[base]), int(legs[base + 1]))
+                    touched.append(line(surface, color, points[i], knee, px(3)))
+                    touched.append(line(surface, color, knee, (int(legs[base + 2]), int(legs[base + 3])), px(3)))
+
+        head = (sprite, (head_x - offset, head_y - offset))
+        touched.append(sprite.get_rect(topleft=head[1]))
+        if batch is None:
+            surface.blit(*head)
+        else:
+            batch.append(head)
+        return touched[0].unionall(touched[1:])
+
+
+def _pixel_sizer(scale):
+    """Maps a line width or joint radius at window resolution to ``scale``."""
+    if scale == 1.0:
+        return int
+    return lambda size: max(1, round(size * scale))
+
+
+def separate_lizards(lizards, grid=None):
+    """Push overlapping lizards apart using a spatial hash of every node.
+
+    Returns the spatial hash, created on first use; pass it back in on the
+    next step and use it for point queries such as ``grid.owner_at``.
+    """
+    # NumPy is only needed once there is more than one lizard
+    import numpy as np
+    from spatial_hash import SpatialHash, separation, tail_nodes
+
+    if grid is None:
+        grid = SpatialHash(cell_size=SEPARATION_RADIUS)
+    spine_points = [pos for lizard in lizards for pos in lizard.spine_positions]
+    # Straight tails from the simulated spine, as in LizardSwarm, push others
+    # away but are not moved; the drawn pose plays no part in the physics
+    tail_points = tail_nodes([lizard.spine_positions[-1] for lizard in lizards],
+                             [lizard.spine_positions[-2] for lizard in lizards])
+    owners = [n for n, lizard in enumerate(lizards) for _ in range(lizard.spine_segments)]
+    owners += [n for n in range(len(lizards)) for _ in range(TAIL_SEGMENTS)]
+    grid.build(np.concatenate([np.array(spine_points, dtype=np.float64), tail_points.reshape(-1, 2)]),
+               owners)
+
+    displacement = separation(grid, SEPARATION_RADIUS, SEPARATION_STRENGTH, len(spine_points))
+    for pos, (dx, dy) in zip(spine_points, displacement.tolist()):
+        pos[0] += dx
+        pos[1] += dy
+    return grid
+
+
+def get_status(lizard):
+    """Movement status label and color shown in the HUD."""
+    if lizard.is_running:
+        return "RUNNING", (255, 100, 100)
+    elif lizard.is_moving:
+        return "WALKING", (100, 255, 100)
+    return "STATIC", (100, 100, 255)
+
+
+def draw_hud(surface, lizard):
+    """Draw instructions and the movement status of ``lizard``.
+
+    Returns the list of Rects the HUD covered. Text comes from the shared
+    ``hud.TextCache``; the main loop uses the retained ``hud.Hud`` instead.
+    """
+    from hud import default_text_cache
+
+    text = default_text_cache.render("F11: Fullscreen | ESC: Exit", (100, 100, 100))
+    help_rect = surface.blit(text, (10, 10))
+
+    # Show movement status
+    status, status_color = get_status(lizard)
+    status_text = default_text_cache.render(f"Status: {status}", status_color)
+    status_rect = surface.blit(status_text, (10, 35))
+    return [help_rect, status_rect]
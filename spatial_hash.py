@@ -0,0 +1,148 @@
+"""
+Spatial Hash for Lizard Crowds
+Uniform-grid index over every spine and tail node, rebuilt each step with a
+sort, for separation forces between lizards and "which lizard is here"
+queries. Cost grows with the number of nodes, not the number of pairs
+"""
+import numpy as np
+
+from pose import TAIL_SEGMENT_LENGTH, TAIL_SEGMENTS
+
+# Keys pack (cell_x, cell_y) into one int64; cells are offset to stay positive
+_KEY_OFFSET = 1 << 20
+_KEY_STRIDE = 1 << 21
+
+# Half of the 3x3 neighborhood, so every pair of cells is visited once
+_HALF_NEIGHBORHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialHash:
+    """Points bucketed into square cells of ``cell_size`` pixels.
+
+    ``build`` takes an ``(M, 2)`` array of points and the id of the lizard
+    owning each point. Queries only look at the cells around the query, so
+    the cell size should be at least the largest query radius.
+    """
+
+    def __init__(self, cell_size=24):
+        self.cell_size = cell_size
+        self.points = np.empty((0, 2))
+        self.owners = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int64)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+
+    def _cell_keys(self, points):
+        cells = np.floor(points / self.cell_size).astype(np.int64) + _KEY_OFFSET
+        return cells[:, 0] * _KEY_STRIDE + cells[:, 1]
+
+    def build(self, points, owners):
+        """Rebuild the index for this step's node positions."""
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.keys = self._cell_keys(self.points)
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+
+    def _gather(self, query_keys):
+        """For each query key, the indices of every point in that cell."""
+        start = np.searchsorted(self.sorted_keys, query_keys, "left")
+        end = np.searchsorted(self.sorted_keys, query_keys, "right")
+        counts = end - start
+        total = counts.sum()
+        # Expand each [start, end) range into a flat index list
+        offsets = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(total)
+        return counts, self.order[offsets]
+
+    def neighbor_pairs(self, radius):
+        """Index pairs ``(i, j)``, ``i != j``, of points closer than ``radius``."""
+        count = len(self.points)
+        pairs_i, pairs_j = [], []
+        for dx, dy in _HALF_NEIGHBORHOOD:
+            counts, j = self._gather(self.keys + dx * _KEY_STRIDE + dy)
+            i = np.repeat(np.arange(count), counts)
+            if dx == 0 and dy == 0:
+                # Same cell: keep each unordered pair once
+                keep = i < j
+                i, j = i[keep], j[keep]
+            pairs_i.append(i)
+            pairs_j.append(j)
+        i = np.concatenate(pairs_i)
+        j = np.concatenate(pairs_j)
+        delta = self.points[i] - self.points[j]
+        close = (delta[:, 0] ** 2 + delta[:, 1] ** 2) < radius * radius
+        return i[close], j[close]
+
+    def query_point(self, x, y, radius):
+        """Indices of points within ``radius`` of ``(x, y)``."""
+        center = self._cell_keys(np.array([[x, y]], dtype=np.float64))[0]
+        reach = int(np.ceil(radius / self.cell_size))
+        offsets = np.arange(-reach, reach + 1)
+        query_keys = (center + offsets[:, np.newaxis] * _KEY_STRIDE + offsets[np.newaxis, :]).ravel()
+        _, candidates = self._gather(query_keys)
+        delta = self.points[candidates] - (x, y)
+        return candidates[(delta[:, 0] ** 2 + delta[:, 1] ** 2) <= radius * radius]
+
+    def owner_at(self, x, y, radius):
+        """Id of the lizard with a node nearest ``(x, y)`` within ``radius``, or -1."""
+        candidates = self.query_point(x, y, radius)
+        if len(candidates) == 0:
+            return -1
+        delta = self.points[candidates] - (x, y)
+        nearest = candidates[np.argmin(delta[:, 0] ** 2 + delta[:, 1] ** 2)]
+        return int(self.owners[nearest])
+
+
+def tail_nodes(last, before):
+    """Tail nodes continuing straight along each lizard's last spine segment.
+
+    ``last`` and ``before`` are the last and second to last spine nodes,
+    ``(N, 2)`` each; returns ``(N, TAIL_SEGMENTS, 2)``. Only spine state goes
+    in, so separation does not depend on the drawn (waving) tail.
+    """
+    last = np.asarray(last, dtype=np.float64)
+    direction = last - np.asarray(before, dtype=np.float64)
+    length = np.sqrt(direction[:, 0] ** 2 + direction[:, 1] ** 2)
+    direction[length == 0] = (1.0, 0.0)
+    length[length == 0] = 1.0
+    direction /= length[:, np.newaxis]
+    steps = np.arange(1, TAIL_SEGMENTS + 1) * TAIL_SEGMENT_LENGTH
+    return last[:, np.newaxis, :] + direction[:, np.newaxis, :] * steps[np.newaxis, :, np.newaxis]
+
+
+def separation(grid, radius, strength=0.5, movable_count=None):
+    """Displacement that pushes apart nodes of different lizards closer than ``radius``.
+
+    Returns an ``(M, 2)`` array matching ``grid.points``. Overlapping nodes
+    are pushed apart along the line between them by ``strength`` times the
+    overlap, split between the two. If ``movable_count`` is given only the
+    first that many points move (e.g. spine nodes but not derived tail nodes).
+    """
+    i, j = grid.neighbor_pairs(radius)
+    other = grid.owners[i] != grid.owners[j]
+    i, j = i[other], j[other]
+
+    delta = grid.points[i] - grid.points[j]
+    dist = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+    # Coincident nodes get pushed apart along x
+    coincident = dist == 0
+    delta[coincident] = (1.0, 0.0)
+    dist[coincident] = 1.0
+
+    push = delta * ((radius - dist) / dist * strength * 0.5)[:, np.newaxis]
+    if movable_count is not None:
+        # A fixed node gives its full share of the push to the other node
+        movable_i = i < movable_count
+        movable_j = j < movable_count
+        push *= np.where(movable_i & movable_j, 1.0, 2.0)[:, np.newaxis]
+        push_i = push * movable_i[:, np.newaxis]
+        push_j = push * movable_j[:, np.newaxis]
+    else:
+        push_i = push_j = push
+
+    count = len(grid.points)
+    displacement = np.empty((count, 2))
+    for axis in (0, 1):
+        displacement[:, axis] = (np.bincount(i, push_i[:, axis], minlength=count)
+                                 - np.bincount(j, push_j[:, axis], minlength=count))
+    return displacement
@@ -0,0 +1,95 @@
+"""
+Joint Sprite Atlas
+Pre-rasterized joint circles (spine nodes, tail beads, leg joints, feet,
+eye sockets and pupils) keyed by radius and quantized hue, so a frame's
+joints can be drawn with one Surface.blits call
+"""
+import colorsys
+from collections import OrderedDict
+
+import pygame
+
+# Transparent color for sprite backgrounds; never produced by the lizard
+# palette (saturation 0.9 keeps every channel above 25)
+COLORKEY = (255, 0, 255)
+
+# Every filled joint radius the skeleton uses at full resolution
+JOINT_RADII = (3, 4, 5, 6, 7, 8)
+
+
+def hue_to_color(hue):
+    """Lizard color for a hue in degrees, same formula as SkeletonLizard.get_color."""
+    rgb = colorsys.hsv_to_rgb(hue / 360, 0.9, 1.0)
+    return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
+
+
+class JointAtlas:
+    """LRU cache of joint sprites keyed by ``(radius, width, hue bucket)``.
+
+    ``get`` returns ``(sprite, offset)``; blit the sprite at
+    ``(x - offset, y - offset)`` to cover the same pixels as
+    ``pygame.draw.circle(surface, color, (x, y), radius, width)``.
+    ``warm`` rasterizes every ``JOINT_RADII`` sprite for every hue bucket
+    up front; anything else (outlined sockets, scaled radii) is rasterized
+    on first use.
+    """
+
+    def __init__(self, hue_buckets=360, max_sprites=4096):
+        self.hue_buckets = hue_buckets
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def hue_key(self, hue):
+        """Quantize a hue in degrees to its atlas bucket."""
+        return int(hue * self.hue_buckets / 360) % self.hue_buckets
+
+    def get(self, radius, hue_key, width=0):
+        """Sprite for a joint; ``hue_key`` of ``None`` gives a black joint."""
+        key = (radius, width, hue_key)
+        entry = self.sprites.get(key)
+        if entry is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if hue_key is None:
+            color = (0, 0, 0)
+        else:
+            color = hue_to_color(hue_key * 360 / self.hue_buckets)
+        entry = (self._rasterize(radius, color, width), radius + 1)
+        self.sprites[key] = entry
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return entry
+
+    def warm(self, radii=JOINT_RADII):
+        """Rasterize the filled sprites of ``radii`` for every hue bucket now."""
+        for hue_key in range(self.hue_buckets):
+            for radius in radii:
+                self.get(radius, hue_key)
+        self.hits = self.misses = 0
+
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"{len(self.sprites)} sprites cached, {rate:.2%} of {lookups} lookups hit"
+
+    def _rasterize(self, radius, color, width):
+        size = radius * 2 + 2
+        sprite = pygame.Surface((size, size))
+        sprite.fill(COLORKEY)
+        pygame.draw.circle(sprite, color, (radius + 1, radius + 1), radius, width)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+
+# Shared atlas used when a caller does not provide its own
+default_atlas = JointAtlas()
@@ -0,0 +1,36 @@
+"""
+Startup Timing Report
+Splits the time from the start of the script to the first presented frame
+into named phases, for --startup-report
+"""
+import time
+
+
+class StartupTimer:
+    """Records the duration of consecutive startup phases.
+
+    Each ``mark`` closes the phase that began at the previous mark (or at
+    ``start``, a ``time.perf_counter`` value taken as early as possible).
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        """One line per phase with its time and share of the total."""
+        total = self.total() or 1.0
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"{name:<{width}}  {seconds * 1e3:8.1f} ms ({seconds / total:6.1%})"
+                 for name, seconds in self.phases]
+        lines.append(f"{'total':<{width}}  {self.total() * 1e3:8.1f} ms")
+        return "\n".join(lines)
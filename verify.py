@@ -0,0 +1,122 @@
+"""
+Headless Equivalence Checks
+Checks that LizardSwarm matches a loop of SkeletonLizard.update and
+separate_lizards step for step over a moving target, and that replaying a recorded input trace reproduces
+the recorded run's state digest exactly. Exits non-zero if a check fails
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from input_trace import LiveInput, TraceRecorder
+from lizard_follower import LizardApp
+from skeleton_lizard import WINDOW_HEIGHT, WINDOW_WIDTH, SkeletonLizard, separate_lizards
+
+
+def moving_target(frame, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
+    """Cursor sweeping a Lissajous figure, with a pause every 4 seconds so lizards also stop."""
+    t = frame / 60
+    if t % 4 > 3:
+        t = math.floor(t / 4) * 4 + 3
+    return (int(width / 2 + math.cos(t * 1.1) * width * 0.4),
+            int(height / 2 + math.sin(t * 1.7) * height * 0.4))
+
+
+def check_swarm(lizard_count=8, spine_segments=8, steps=900, seed=0, tolerance=1e-9):
+    """Largest difference between swarm and loop state; raises AssertionError past ``tolerance``."""
+    from lizard_swarm import LizardSwarm
+
+    rng = random.Random(seed)
+    positions = [(rng.uniform(0, WINDOW_WIDTH), rng.uniform(0, WINDOW_HEIGHT)) for _ in range(lizard_count)]
+    swarm = LizardSwarm(positions, spine_segments)
+    lizards = [SkeletonLizard(x, y, spine_segments) for x, y in positions]
+
+    worst = 0.0
+    grid = None
+    for step in range(steps):
+        target = moving_target(step)
+        swarm.update(target)
+        swarm.separate()
+        for lizard in lizards:
+            lizard.update(*target)
+        grid = separate_lizards(lizards, grid)
+        for n, lizard in enumerate(lizards):
+            error = max(max(abs(a - b) for a, b in zip(node, swarm.spines[n, i]))
+                        for i, node in enumerate(lizard.spine_positions))
+            error = max(error, abs(lizard.current_speed - swarm.current_speed[n]),
+                        abs(lizard.hue - swarm.hue[n]))
+            assert lizard.is_moving == swarm.is_moving[n], f"step {step}, lizard {n}: is_moving differs"
+            assert error <= tolerance, f"step {step}, lizard {n}: swarm differs by {error:g}"
+            worst = max(worst, error)
+    return worst
+
+
+class ScriptedInput(LiveInput):
+    """Live events and clock, with the cursor following ``moving_target``."""
+
+    def __init__(self, recorder):
+        super().__init__(recorder)
+        self.frame = 0
+
+    def poll(self):
+        events = pygame.event.get()
+        tick = pygame.time.get_ticks()
+        mouse_pos = moving_target(self.frame)
+        self.frame += 1
+        self.recorder.record_events(tick, events)
+        self.recorder.record_frame(tick, *mouse_pos)
+        return tick, mouse_pos, events
+
+
+def check_replay(lizard_count=3, frames=600, fps=120):
+    """Record a run, replay its trace; returns the digest both runs ended with."""
+    with tempfile.TemporaryDirectory() as directory:
+        trace = os.path.join(directory, "verify.lztr")
+        app = LizardApp(headless=True, lizard_count=lizard_count, fps=fps)
+        app.input = ScriptedInput(TraceRecorder(trace))
+        app.run(max_frames=frames)
+        recorded = app.state_digest()
+
+        replay = LizardApp(headless=True, lizard_count=lizard_count, fps=0, replay=trace)
+        replay.run()
+        replayed = replay.state_digest()
+    assert replayed == recorded, f"replay digest {replayed} != recorded {recorded}"
+    return recorded
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lizards", type=int, default=8, help="lizards in the swarm check")
+    parser.add_argument("--steps", type=int, default=900, help="simulation steps in the swarm check")
+    parser.add_argument("--frames", type=int, default=600, help="recorded frames in the replay check")
+    parser.add_argument("--skip-swarm", action="store_true", help="skip the swarm check (needs NumPy)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failed = False
+    checks = [("replay", lambda: f"digest {check_replay(frames=args.frames)}")]
+    if not args.skip_swarm:
+        checks.insert(0, ("swarm", lambda: "max difference "
+                          f"{check_swarm(args.lizards, steps=args.steps):.3g}"))
+    for name, check in checks:
+        try:
+            print(f"{name:>6}: ok, {check()}")
+        except AssertionError as error:
+            print(f"{name:>6}: FAILED, {error}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()